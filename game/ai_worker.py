@@ -0,0 +1,72 @@
+# ai_worker.py
+"""Decisiones de la IA en un hilo aparte, con búsqueda anticipada (ponder).
+
+Mientras el jugador piensa, el hilo de la IA calcula la respuesta a cada uno de
+los ataques posibles del jugador. Cuando el jugador elige, la respuesta ya está
+lista (o en curso) y el bucle de la interfaz solo consulta un Future, así que
+el tiempo por cuadro no depende de la profundidad de búsqueda.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, Optional, Tuple
+from .battle import BattleSystem
+from .engines import Engine
+
+class AIWorker:
+    """Usa el motor del combate (battle.engine); sus callbacks de estadísticas se llaman desde el hilo de la IA."""
+
+    def __init__(self, battle: BattleSystem):
+        self.battle = battle
+        # Un solo hilo: las búsquedas se ejecutan de a una y comparten la tabla sin carreras.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ia")
+        self._pondering: Dict[int, Tuple[Future, Engine]] = {}
+        self._pending: Optional[Engine] = None
+
+    def _decide(self, ai_hp: int, player_hp: int, engine: Engine) -> int:
+        ai_pokemon = replace(self.battle.ai_pokemon, current_hp=ai_hp)
+        player_pokemon = replace(self.battle.player_pokemon, current_hp=player_hp)
+        # El índice sale directo del motor: dos ataques iguales no se confunden.
+        return engine.choose(ai_pokemon, player_pokemon)
+
+    def ponder(self) -> None:
+        """Encola la respuesta de la IA a cada ataque posible del jugador."""
+        self._cancel_pondering()
+        battle = self.battle
+        if battle.rules is not None:
+            return  # con daño aleatorio no se sabe de antemano en qué estado quedará la IA
+        ai_hp, player_hp = battle.ai_pokemon.current_hp, battle.player_pokemon.current_hp
+        for index, damage in enumerate(battle.player_damage):
+            if ai_hp - damage <= 0:
+                continue
+            engine = battle.engine.branch(index)
+            future = self._executor.submit(self._decide, ai_hp - damage, player_hp, engine)
+            self._pondering[index] = (future, engine)
+
+    def reply_to(self, player_index: int) -> Future:
+        """Future con el ataque de la IA; llamar después de ejecutar la jugada del jugador."""
+        pondered = self._pondering.pop(player_index, None)
+        self._cancel_pondering()
+        if pondered is None:
+            battle = self.battle
+            engine = battle.engine.branch()
+            future = self._executor.submit(self._decide, battle.ai_pokemon.current_hp,
+                                           battle.player_pokemon.current_hp, engine)
+        else:
+            future, engine = pondered
+        self._pending = engine
+        return future
+
+    def finish(self) -> None:
+        """Pasa al combate lo aprendido en la rama usada; llamar antes de ejecutar el ataque de la IA."""
+        if self._pending is not None:
+            self.battle.engine.adopt(self._pending)
+            self._pending = None
+
+    def _cancel_pondering(self) -> None:
+        for future, _ in self._pondering.values():
+            future.cancel()
+        self._pondering.clear()
+
+    def shutdown(self) -> None:
+        self._cancel_pondering()
+        self._executor.shutdown(wait=False, cancel_futures=True)
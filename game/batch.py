@@ -0,0 +1,119 @@
+# batch.py
+"""Evaluación vectorizada de muchas posiciones independientes con NumPy.
+
+Cada posición es (especie IA, especie jugador, PS IA, PS jugador) con la IA por
+mover. En vez de una recursión de Python por posición, el árbol completo hasta
+`depth` se recorre una sola vez con operaciones sobre arreglos de todo el lote.
+Sin poda, los valores coinciden exactamente con `root_search` a la misma
+profundidad; es la vía rápida para mapas de calor y ajustes sobre el roster.
+"""
+from typing import Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+from .minimax import MAX_DEPTH, WIN_SCORE
+from .pokemon import damage_table, pokemon_loader
+
+_LOW = -(WIN_SCORE + 1)
+_HIGH = WIN_SCORE + 1
+
+class RosterDamage:
+    """Daño de cada ataque de cada especie contra cada especie del roster.
+
+    damage[i, j, k] es el daño del ataque k de la especie i contra la especie j;
+    los ataques que una especie no tiene quedan marcados como inválidos en `valid`.
+    """
+
+    def __init__(self):
+        roster = list(pokemon_loader.pokemon_db.values())
+        self.index: Dict[str, int] = {p.name.lower(): i for i, p in enumerate(roster)}
+        self.max_hp = np.array([p.max_hp for p in roster], dtype=np.int64)
+        moves = max(len(p.attacks) for p in roster)
+        self.damage = np.zeros((len(roster), len(roster), moves), dtype=np.int64)
+        self.valid = np.zeros((len(roster), moves), dtype=bool)
+        for i, attacker in enumerate(roster):
+            self.valid[i, :len(attacker.attacks)] = True
+            for j, defender in enumerate(roster):
+                row = damage_table(attacker, defender)
+                self.damage[i, j, :len(row)] = row
+
+    def ids(self, species: Union[Sequence[str], Sequence[int], np.ndarray]) -> np.ndarray:
+        array = np.asarray(species)
+        if array.dtype.kind in "iu":
+            return array.astype(np.int64)
+        try:
+            return np.array([self.index[str(name).lower()] for name in array.ravel()], dtype=np.int64).reshape(array.shape)
+        except KeyError as e:
+            raise ValueError(f"{e.args[0]} no está en la base de datos") from None
+
+_roster: Optional[RosterDamage] = None
+
+def roster_damage() -> RosterDamage:
+    global _roster
+    if _roster is None:
+        _roster = RosterDamage()
+    return _roster
+
+def evaluate_batch(ai_hp: np.ndarray, player_hp: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de `evaluate_hp`."""
+    return np.where(player_hp <= 0, WIN_SCORE, np.where(ai_hp <= 0, -WIN_SCORE, ai_hp - player_hp))
+
+def _minimax_batch(ai_damage: np.ndarray, player_damage: np.ndarray, ai_valid: np.ndarray, player_valid: np.ndarray,
+                   ai_hp: np.ndarray, player_hp: np.ndarray, depth: int, is_maximizing: bool) -> np.ndarray:
+    leaf = evaluate_batch(ai_hp, player_hp)
+    if depth == 0:
+        return leaf
+    if is_maximizing:
+        best = np.full(leaf.shape, _LOW, dtype=np.int64)
+        for k in range(ai_damage.shape[1]):
+            child = _minimax_batch(ai_damage, player_damage, ai_valid, player_valid,
+                                   ai_hp, player_hp - ai_damage[:, k], depth - 1, False)
+            best = np.where(ai_valid[:, k], np.maximum(best, child), best)
+    else:
+        best = np.full(leaf.shape, _HIGH, dtype=np.int64)
+        for k in range(player_damage.shape[1]):
+            child = _minimax_batch(ai_damage, player_damage, ai_valid, player_valid,
+                                   ai_hp - player_damage[:, k], player_hp, depth - 1, True)
+            best = np.where(player_valid[:, k], np.minimum(best, child), best)
+    terminal = (ai_hp <= 0) | (player_hp <= 0)
+    return np.where(terminal, leaf, best)
+
+def batch_decision(ai_species, player_species, ai_hp=None, player_hp=None,
+                   depth: int = MAX_DEPTH) -> Tuple[np.ndarray, np.ndarray]:
+    """Mejor ataque y puntaje de la IA para cada posición del lote.
+
+    Las especies pueden ser nombres o índices del roster; si no se indican PS se
+    usan los máximos de cada especie. Ante empates gana el ataque de menor
+    índice, igual que `minimax_decision`.
+    """
+    if depth < 1:
+        # La raíz ya consume un nivel: con depth <= 0 la recursión nunca llegaría a las hojas.
+        raise ValueError(f"depth debe ser al menos 1 (se recibió {depth})")
+    roster = roster_damage()
+    ai_ids, player_ids = np.broadcast_arrays(roster.ids(ai_species), roster.ids(player_species))
+    shape = ai_ids.shape
+    ai_ids, player_ids = ai_ids.ravel(), player_ids.ravel()
+    ai_hp = roster.max_hp[ai_ids] if ai_hp is None else np.broadcast_to(np.asarray(ai_hp, dtype=np.int64), shape).ravel()
+    player_hp = (roster.max_hp[player_ids] if player_hp is None
+                 else np.broadcast_to(np.asarray(player_hp, dtype=np.int64), shape).ravel())
+
+    ai_damage = roster.damage[ai_ids, player_ids]
+    player_damage = roster.damage[player_ids, ai_ids]
+    ai_valid = roster.valid[ai_ids]
+    player_valid = roster.valid[player_ids]
+
+    scores = np.stack([
+        _minimax_batch(ai_damage, player_damage, ai_valid, player_valid,
+                       ai_hp, player_hp - ai_damage[:, k], depth - 1, False)
+        for k in range(ai_damage.shape[1])
+    ], axis=1)
+    scores = np.where(ai_valid, scores, _LOW)
+    best_moves = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(best_moves)), best_moves]
+    return best_moves.reshape(shape), best_scores.reshape(shape)
+
+def hp_grid(ai_name: str, player_name: str, depth: int = MAX_DEPTH) -> Tuple[np.ndarray, np.ndarray]:
+    """Decisión para todos los pares de PS de un enfrentamiento; índices [ai_hp - 1, player_hp - 1]."""
+    roster = roster_damage()
+    ai_id, player_id = roster.ids([ai_name, player_name])
+    ai_hp, player_hp = np.meshgrid(np.arange(1, roster.max_hp[ai_id] + 1),
+                                   np.arange(1, roster.max_hp[player_id] + 1), indexing="ij")
+    return batch_decision(np.full(ai_hp.shape, ai_id), np.full(ai_hp.shape, player_id), ai_hp, player_hp, depth)
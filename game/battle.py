@@ -1,6 +1,10 @@
+import random
 from dataclasses import dataclass
-from typing import Optional, List
-from .pokemon import Pokemon, Attack, calculate_damage, is_fainted, get_pokemon
+from typing import Optional, List, Union
+from .pokemon import Pokemon, Attack, Ruleset, damage_table, is_fainted, get_pokemon
+from .policy import load_policy_book
+from .minimax import SearchContext
+from .engines import Engine, create_engine
 
 @dataclass
 class BattleState:
@@ -12,15 +16,31 @@ class BattleState:
     last_move: Optional[str] = None
 
 class BattleSystem:
-    def __init__(self, player_name: str, ai_name: str):
+    def __init__(self, player_name: str, ai_name: str, rules: Optional[Ruleset] = None,
+                 seed: Optional[int] = None, engine: Union[Engine, str, None] = None):
         self.player_pokemon = get_pokemon(player_name)
         self.ai_pokemon = get_pokemon(ai_name)
+        # Las especies no cambian durante el combate: el daño de cada ataque se calcula una sola vez.
+        self.player_damage = damage_table(self.player_pokemon, self.ai_pokemon)
+        self.ai_damage = damage_table(self.ai_pokemon, self.player_pokemon)
+        # El contexto de búsqueda (tabla de transposición, variante principal, killers e historia)
+        # vive lo mismo que el combate: los turnos siguientes reutilizan lo ya buscado.
+        self.search = SearchContext()
+        self._endgame = None
+        # Con un Ruleset los golpes pueden fallar, variar o ser críticos; sin él el combate es determinista.
+        self.rules = rules
+        self.rng = random.Random(seed)
+        # Motor de la IA (ver game.engines); por defecto minimax, o expectiminimax si hay reglas aleatorias.
+        if engine is None:
+            engine = "minimax" if rules is None else "expectiminimax"
+        self.engine = create_engine(engine) if isinstance(engine, str) else engine
 
         self.state = BattleState(
             player_pokemon=self.player_pokemon,
             ai_pokemon=self.ai_pokemon,
             current_turn='player'
         )
+        self.engine.bind(self)
 
     def execute_move(self, attack_index: int) -> bool:
         if self.state.game_over:
@@ -30,9 +50,9 @@ class BattleSystem:
         if self.state.current_turn == 'player':
             if 0 <= attack_index < len(self.player_pokemon.attacks):
                 attack = self.player_pokemon.attacks[attack_index]
-                damage = calculate_damage(self.player_pokemon, self.ai_pokemon, attack)
+                damage = self._hit(self.player_pokemon, attack, self.player_damage[attack_index])
                 self.ai_pokemon.current_hp -= damage
-                self.state.last_move = f"{self.player_pokemon.name} usó {attack.name} ({damage} de daño)"
+                self.search.record_move(attack_index)
                 if is_fainted(self.ai_pokemon):
                     self.state.game_over = True
                     self.state.winner = "player"
@@ -42,13 +62,12 @@ class BattleSystem:
         # 🤖 Turno de la IA
         elif self.state.current_turn == 'ai':
             if attack_index == -1:
-                attack = self._select_best_ai_attack()
-            else:
-                attack = self.ai_pokemon.attacks[attack_index]
+                attack_index = self._select_best_ai_attack()
+            attack = self.ai_pokemon.attacks[attack_index]
 
-            damage = calculate_damage(self.ai_pokemon, self.player_pokemon, attack)
+            damage = self._hit(self.ai_pokemon, attack, self.ai_damage[attack_index])
             self.player_pokemon.current_hp -= damage
-            self.state.last_move = f"{self.ai_pokemon.name} usó {attack.name} ({damage} de daño)"
+            self.search.record_move(attack_index)
             if is_fainted(self.player_pokemon):
                 self.state.game_over = True
                 self.state.winner = "ai"
@@ -57,11 +76,37 @@ class BattleSystem:
 
         return self.state.game_over
 
-    def _select_best_ai_attack(self) -> Attack:
-        return max(
-            self.ai_pokemon.attacks,
-            key=lambda atk: calculate_damage(self.ai_pokemon, self.player_pokemon, atk)
-        )
+    def _hit(self, attacker: Pokemon, attack: Attack, base_damage: int) -> int:
+        """Daño real del golpe según las reglas; deja el mensaje en last_move."""
+        if self.rules is None:
+            self.state.last_move = f"{attacker.name} usó {attack.name} ({base_damage} de daño)"
+            return base_damage
+        hit = self.rules.roll(base_damage, attack.accuracy, self.rng)
+        if hit is None:
+            self.state.last_move = f"{attacker.name} usó {attack.name}, pero falló"
+            return 0
+        critical = " ¡Golpe crítico!" if hit.critical else ""
+        self.state.last_move = f"{attacker.name} usó {attack.name} ({hit.damage} de daño){critical}"
+        return hit.damage
+
+    def _select_best_ai_attack(self) -> int:
+        return max(range(len(self.ai_damage)), key=self.ai_damage.__getitem__)
+
+    def endgame_table(self):
+        """Tabla exacta del enfrentamiento.
+
+        Se usa el archivo precalculado de game.policy si está al día; si no, se
+        resuelve el enfrentamiento la primera vez que se pide. La tabla supone
+        daño determinista: con un Ruleset no es exacta.
+        """
+        if self._endgame is None:
+            book = load_policy_book()
+            if book is not None:
+                self._endgame = book.view(self.ai_pokemon.name, self.player_pokemon.name)
+        if self._endgame is None:
+            from .endgame import solve_pokemon  # NumPy solo hace falta en este modo
+            self._endgame = solve_pokemon(self.ai_pokemon, self.player_pokemon)
+        return self._endgame
 
     def get_available_attacks(self) -> List[Attack]:
         return self.player_pokemon.attacks
@@ -0,0 +1,123 @@
+# endgame.py
+"""Resolución exacta de un enfrentamiento por análisis retrógrado.
+
+Los combates son deterministas y el estado completo es (PS de la IA, PS del
+jugador, turno), así que se puede calcular el valor teórico de todos los
+estados de una vez. Los valores siguen la escala de `evaluate_hp`: una victoria
+de la IA en n jugadas vale WIN_SCORE - n, una derrota -(WIN_SCORE - n) y un
+combate que nadie puede terminar (ataques sin daño en bucle) vale 0.
+"""
+from typing import Tuple
+import numpy as np
+from .minimax import Matchup, WIN_SCORE
+from .pokemon import Pokemon
+
+AI_TO_MOVE = 0
+PLAYER_TO_MOVE = 1
+
+# Centinelas para "ningún ataque con daño"; quedan fuera del rango de valores reales.
+_NO_MOVE_LOW = -(WIN_SCORE + 1)
+_NO_MOVE_HIGH = WIN_SCORE + 1
+
+class EndgameTable:
+    """Valor y mejor ataque de cada estado (turno, ai_hp, player_hp) de un enfrentamiento."""
+    __slots__ = ("values", "best_moves")
+
+    def __init__(self, values: np.ndarray, best_moves: np.ndarray):
+        self.values = values
+        self.best_moves = best_moves
+
+    @property
+    def max_ai_hp(self) -> int:
+        return self.values.shape[1] - 1
+
+    @property
+    def max_player_hp(self) -> int:
+        return self.values.shape[2] - 1
+
+    def value(self, ai_hp: int, player_hp: int, ai_to_move: bool = True) -> int:
+        side = AI_TO_MOVE if ai_to_move else PLAYER_TO_MOVE
+        return int(self.values[side, max(ai_hp, 0), max(player_hp, 0)])
+
+    def best_move(self, ai_hp: int, player_hp: int, ai_to_move: bool = True) -> int:
+        """Índice del ataque óptimo para el lado que mueve; 0 en estados terminales."""
+        if ai_hp <= 0 or player_hp <= 0:
+            return 0
+        side = AI_TO_MOVE if ai_to_move else PLAYER_TO_MOVE
+        return int(self.best_moves[side, ai_hp, player_hp])
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    """Aleja un valor una jugada del final: las victorias y derrotas pierden un punto, el empate queda en 0."""
+    return values - np.sign(values)
+
+def _resolve_loops(best_ai: np.ndarray, best_player: np.ndarray,
+                   ai_passes: bool, player_passes: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Combina los ataques con daño con los ataques sin daño, que devuelven el turno sin cambiar los PS.
+
+    best_ai / best_player son el mejor valor alcanzable con daño para cada lado
+    (o un centinela si el lado no tiene ataques con daño).
+    """
+    if ai_passes and player_passes:
+        ai_can_hit = best_ai != _NO_MOVE_LOW
+        player_can_hit = best_player != _NO_MOVE_HIGH
+        # Quien gana o empata atacando lo hace; si no, pasa el turno y el rival decide
+        # entre atacar (si le conviene) o repetir el bucle hasta el empate.
+        value_ai = np.where(ai_can_hit & (best_ai >= 0), best_ai,
+                            np.where(player_can_hit & (best_player < 0), np.maximum(best_ai, _shift(best_player)), 0))
+        value_player = np.where(player_can_hit & (best_player <= 0), best_player,
+                                np.where(ai_can_hit & (best_ai > 0), np.minimum(best_player, _shift(best_ai)), 0))
+        return value_ai, value_player
+    if ai_passes:
+        return np.maximum(best_ai, _shift(best_player)), best_player
+    if player_passes:
+        return best_ai, np.minimum(best_player, _shift(best_ai))
+    return best_ai, best_player
+
+def solve_matchup(matchup: Matchup, max_ai_hp: int, max_player_hp: int) -> EndgameTable:
+    """Resuelve todos los estados con PS entre 1 y el máximo de cada lado.
+
+    Los PS solo bajan, así que los estados se procesan por diagonales de
+    ai_hp + player_hp crecientes: cada ataque con daño lleva a una diagonal ya
+    resuelta y cada diagonal se calcula de forma vectorizada.
+    """
+    if not matchup.ai_damage or not matchup.player_damage:
+        raise ValueError("Ambos Pokémon necesitan al menos un ataque")
+    ai_hits = sorted({d for d in matchup.ai_damage if d > 0})
+    player_hits = sorted({d for d in matchup.player_damage if d > 0})
+    ai_passes = 0 in matchup.ai_damage
+    player_passes = 0 in matchup.player_damage
+
+    shape = (max_ai_hp + 1, max_player_hp + 1)
+    value_ai = np.zeros(shape, dtype=np.int32)
+    value_player = np.zeros(shape, dtype=np.int32)
+    value_ai[:, 0] = value_player[:, 0] = WIN_SCORE
+    value_ai[0, :] = value_player[0, :] = -WIN_SCORE
+
+    for total in range(2, max_ai_hp + max_player_hp + 1):
+        ai_hp = np.arange(max(1, total - max_player_hp), min(max_ai_hp, total - 1) + 1)
+        player_hp = total - ai_hp
+
+        best_ai = np.full(ai_hp.shape, _NO_MOVE_LOW, dtype=np.int32)
+        for damage in ai_hits:
+            best_ai = np.maximum(best_ai, _shift(value_player[ai_hp, np.maximum(player_hp - damage, 0)]))
+        best_player = np.full(ai_hp.shape, _NO_MOVE_HIGH, dtype=np.int32)
+        for damage in player_hits:
+            best_player = np.minimum(best_player, _shift(value_ai[np.maximum(ai_hp - damage, 0), player_hp]))
+
+        value_ai[ai_hp, player_hp], value_player[ai_hp, player_hp] = _resolve_loops(
+            best_ai, best_player, ai_passes, player_passes)
+
+    # Mejor ataque de cada estado: primer índice con el valor óptimo, igual que minimax_decision.
+    ai_grid, player_grid = np.indices(shape)
+    ai_options = np.stack([
+        _shift(value_player[ai_grid, np.maximum(player_grid - damage, 0)]) for damage in matchup.ai_damage
+    ])
+    player_options = np.stack([
+        _shift(value_ai[np.maximum(ai_grid - damage, 0), player_grid]) for damage in matchup.player_damage
+    ])
+    best_moves = np.stack([ai_options.argmax(axis=0), player_options.argmin(axis=0)]).astype(np.int8)
+    values = np.stack([value_ai, value_player]).astype(np.int16)
+    return EndgameTable(values, best_moves)
+
+def solve_pokemon(ai_pokemon: Pokemon, player_pokemon: Pokemon) -> EndgameTable:
+    return solve_matchup(Matchup(ai_pokemon, player_pokemon), ai_pokemon.max_hp, player_pokemon.max_hp)
@@ -0,0 +1,233 @@
+# engines.py
+"""Motores de decisión de la IA, intercambiables por combate.
+
+Un motor recibe los dos Pokémon con sus PS actuales y devuelve el índice del
+ataque de la IA. `AIPlayer`, `AIWorker`, `BattleSystem` y el simulador solo
+hablan con esta interfaz, así que cambiar de algoritmo es cambiar de motor:
+
+    BattleSystem("pikachu", "charmander", engine=create_engine("mcts", iterations=5000))
+"""
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Type
+from .evaluation import Weights
+from .mcts import (DEFAULT_EXPLORATION, DEFAULT_ITERATIONS, Node, Tree, best_action, compile_outcomes,
+                   parallel_search)
+from .minimax import (CHANCE_DEPTH, MAX_DEPTH, Matchup, SearchContext, StochasticMatchup, decision_with_stats,
+                      expectiminimax_decision, minimax_decision, timed_decision)
+from .pokemon import Pokemon, Ruleset
+from .search_stats import SearchStats
+
+if TYPE_CHECKING:
+    from .battle import BattleSystem
+
+class Engine:
+    """Interfaz común de los motores.
+
+    `bind` lo asocia a un combate (contexto de búsqueda, reglas, tabla exacta);
+    `branch` y `adopt` permiten buscar en otro hilo sin tocar el estado que usa
+    el hilo principal (ver AIWorker). Los motores sin estado no necesitan más
+    que `choose`.
+    """
+    name = ""
+
+    def __init__(self):
+        self.last_stats: Optional[SearchStats] = None
+
+    def bind(self, battle: "BattleSystem") -> None:
+        pass
+
+    def choose(self, ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
+        raise NotImplementedError("Este método debe ser implementado por las subclases.")
+
+    def branch(self, *moves: int) -> "Engine":
+        """Copia para decidir tras las jugadas `moves`."""
+        return self
+
+    def adopt(self, other: "Engine") -> None:
+        """Toma lo aprendido por una copia de `branch` ya terminada."""
+
+    def close(self) -> None:
+        """Libera procesos u otros recursos del motor."""
+
+class MinimaxEngine(Engine):
+    """Alfa-beta a profundidad fija o, con `time_budget_ms`, por profundización iterativa.
+
+    Con `weights` (ver game.evaluation) las hojas usan la evaluación ajustada; como
+    cambia los puntajes, el contexto no debe compartirse con búsquedas sin pesos.
+    """
+    name = "minimax"
+
+    def __init__(self, depth: int = MAX_DEPTH, time_budget_ms: Optional[float] = None,
+                 context: Optional[SearchContext] = None, on_stats: Optional[Callable[[Dict], None]] = None,
+                 weights: Optional[Weights] = None):
+        super().__init__()
+        self.depth = depth
+        self.time_budget_ms = time_budget_ms
+        self.weights = weights
+        # Con el contexto del combate (BattleSystem.search) se reutiliza lo aprendido en turnos anteriores.
+        self.context = context
+        # Si se indica, recibe las estadísticas de cada búsqueda como un dict (ver SearchStats.as_record).
+        self.on_stats = on_stats
+
+    def bind(self, battle: "BattleSystem") -> None:
+        if self.context is None:
+            self.context = battle.search
+
+    def choose(self, ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
+        if self.on_stats is not None:
+            index, self.last_stats = decision_with_stats(ai_pokemon, player_pokemon, self.depth,
+                                                         self.time_budget_ms, self.context, self.weights)
+            self.on_stats(self.last_stats.as_record())
+            return index
+        if self.time_budget_ms is None:
+            return minimax_decision(ai_pokemon, player_pokemon, self.depth, context=self.context,
+                                    weights=self.weights)
+        return timed_decision(ai_pokemon, player_pokemon, self.time_budget_ms, context=self.context,
+                              weights=self.weights)
+
+    def branch(self, *moves: int) -> "MinimaxEngine":
+        context = self.context.branch(*moves) if self.context is not None else None
+        return MinimaxEngine(self.depth, self.time_budget_ms, context, self.on_stats, self.weights)
+
+    def adopt(self, other: Engine) -> None:
+        if self.context is not None and isinstance(other, MinimaxEngine) and other.context is not None:
+            self.context.adopt(other.context)
+
+class EndgameEngine(Engine):
+    """Juego perfecto con la tabla exacta del enfrentamiento (ver game.endgame y game.policy)."""
+    name = "endgame"
+
+    def __init__(self, table=None):
+        super().__init__()
+        self.table = table
+
+    def bind(self, battle: "BattleSystem") -> None:
+        if self.table is None:
+            self.table = battle.endgame_table()
+
+    def choose(self, ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
+        if self.table is None:
+            raise ValueError("EndgameEngine necesita una tabla: pásala o asócialo a un combate")
+        return self.table.best_move(ai_pokemon.current_hp, player_pokemon.current_hp)
+
+class ExpectiminimaxEngine(Engine):
+    """Expectiminimax con poda Star1/Star2 para combates con un Ruleset."""
+    name = "expectiminimax"
+
+    def __init__(self, rules: Optional[Ruleset] = None, depth: int = CHANCE_DEPTH,
+                 on_stats: Optional[Callable[[Dict], None]] = None):
+        super().__init__()
+        self.rules = rules
+        self.depth = depth
+        self.on_stats = on_stats
+
+    def bind(self, battle: "BattleSystem") -> None:
+        if self.rules is None:
+            self.rules = battle.rules
+
+    def choose(self, ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
+        if self.rules is None:
+            raise ValueError("ExpectiminimaxEngine necesita un Ruleset")
+        stats = SearchStats() if self.on_stats is not None else None
+        index = expectiminimax_decision(ai_pokemon, player_pokemon, self.rules, self.depth, stats)
+        if stats is not None:
+            self.last_stats = stats
+            self.on_stats(stats.as_record())
+        return index
+
+class MCTSEngine(Engine):
+    """UCT con presupuesto de iteraciones (o de tiempo) y árbol reutilizado entre turnos.
+
+    Si el combate tiene un Ruleset, las jugadas se sortean con sus resultados;
+    si no, con el daño determinista. Con `workers > 1` cada decisión reparte las
+    iteraciones entre procesos (paralelización por raíz); en ese modo el árbol
+    vive en los procesos y no se reutiliza.
+    """
+    name = "mcts"
+
+    def __init__(self, iterations: int = DEFAULT_ITERATIONS, time_budget_ms: Optional[float] = None,
+                 exploration: float = DEFAULT_EXPLORATION, workers: int = 1, rules: Optional[Ruleset] = None,
+                 seed: Optional[int] = None):
+        super().__init__()
+        self.iterations = iterations
+        self.time_budget_ms = time_budget_ms
+        self.exploration = exploration
+        self.workers = workers
+        self.rules = rules
+        self.rng = random.Random(seed)
+        self._tree: Optional[Tree] = None
+        self._species = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def bind(self, battle: "BattleSystem") -> None:
+        if self.rules is None:
+            self.rules = battle.rules
+
+    def _tree_for(self, ai_pokemon: Pokemon, player_pokemon: Pokemon) -> Tree:
+        species = (ai_pokemon.name, player_pokemon.name)
+        hp = (ai_pokemon.current_hp, player_pokemon.current_hp)
+        if self._tree is None or self._species != species:
+            matchup = (Matchup(ai_pokemon, player_pokemon) if self.rules is None
+                       else StochasticMatchup(ai_pokemon, player_pokemon, self.rules))
+            self._species = species
+            self._tree = Tree(compile_outcomes(matchup), Node(*hp, True, len(ai_pokemon.attacks)),
+                              self.exploration, self.rng)
+            return self._tree
+        # El estado actual suele estar dos jugadas (IA y jugador) debajo de la raíz anterior.
+        tree = self._tree
+        tree.root = tree.root.find(*hp, True) or Node(*hp, True, len(ai_pokemon.attacks))
+        return tree
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def choose(self, ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
+        tree = self._tree_for(ai_pokemon, player_pokemon)
+        if self.workers > 1:
+            visits = parallel_search(self._process_pool(), self.workers, tree.outcomes, ai_pokemon.current_hp,
+                                     player_pokemon.current_hp, self.iterations, self.time_budget_ms,
+                                     self.exploration, self.rng.randrange(2 ** 31))
+            return best_action(visits)
+        deadline = None
+        if self.time_budget_ms is not None:
+            deadline = time.perf_counter() + self.time_budget_ms / 1000
+        tree.run(self.iterations, deadline)
+        return best_action(tree.root.action_visits)
+
+    def branch(self, *moves: int) -> "MCTSEngine":
+        # La copia comparte los nodos pero tiene su propia raíz; AIWorker busca de a una rama por vez.
+        engine = MCTSEngine(self.iterations, self.time_budget_ms, self.exploration, self.workers, self.rules)
+        engine.rng = self.rng
+        # El pool se crea aquí y no en la rama: así lo comparten todas y `close` lo cierra una sola vez.
+        engine._species = self._species
+        engine._pool = self._process_pool() if self.workers > 1 else None
+        if self._tree is not None:
+            engine._tree = Tree(self._tree.outcomes, self._tree.root, self.exploration, self.rng)
+        return engine
+
+    def adopt(self, other: Engine) -> None:
+        if isinstance(other, MCTSEngine):
+            self._tree, self._species = other._tree, other._species
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+ENGINES: Dict[str, Type[Engine]] = {
+    MinimaxEngine.name: MinimaxEngine,
+    EndgameEngine.name: EndgameEngine,
+    ExpectiminimaxEngine.name: ExpectiminimaxEngine,
+    MCTSEngine.name: MCTSEngine,
+}
+
+def create_engine(name: str, **options) -> Engine:
+    try:
+        engine_class = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Motor desconocido: {name} (disponibles: {', '.join(ENGINES)})") from None
+    return engine_class(**options)
@@ -0,0 +1,96 @@
+# evaluation.py
+"""Evaluación estática parametrizada para las hojas de minimax.
+
+La evaluación de siempre es `ai_hp - player_hp`. Esta la generaliza como una
+suma ponderada de rasgos del estado, todos desde el punto de vista de la IA:
+
+    hp          ai_hp - player_hp (la evaluación original)
+    hp_ratio    diferencia de PS relativos, en puntos porcentuales
+    ko_margin   golpes que le faltan al jugador para debilitar a la IA menos los que le faltan
+                a la IA, con medio golpe a favor de quien mueve; acotado a ±MAX_KO_TURNS
+    pressure    porcentaje de los PS restantes del rival que quita el mejor ataque de cada
+                lado (ya ponderado por efectividad), IA menos jugador
+
+Con los pesos por defecto (`hp` = 1, el resto 0) el puntaje es idéntico al
+original. `python -m game.tune` ajusta los pesos con partidas de autojuego y
+los guarda en un JSON que se carga con `Weights.load`.
+"""
+import json
+import math
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Tuple
+from .minimax import WIN_SCORE
+from .pokemon import Pokemon, damage_table
+
+FEATURES = ("hp", "hp_ratio", "ko_margin", "pressure")
+MAX_KO_TURNS = 20
+WEIGHTS_VERSION = 1
+DEFAULT_WEIGHTS_PATH = Path(__file__).parent.parent / "data" / "eval_weights.json"
+
+@dataclass(frozen=True)
+class Weights:
+    hp: float = 1.0
+    hp_ratio: float = 0.0
+    ko_margin: float = 0.0
+    pressure: float = 0.0
+
+    def as_tuple(self) -> Tuple[float, ...]:
+        return tuple(getattr(self, name) for name in FEATURES)
+
+    @classmethod
+    def from_tuple(cls, values) -> "Weights":
+        return cls(*(float(v) for v in values))
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_WEIGHTS_PATH) -> "Weights":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != WEIGHTS_VERSION:
+            raise ValueError(f"{path}: versión de pesos {data.get('version')}, se esperaba {WEIGHTS_VERSION}")
+        known = {f.name for f in fields(cls)}
+        unknown = set(data["weights"]) - known
+        if unknown:
+            raise ValueError(f"{path}: rasgos desconocidos {sorted(unknown)}")
+        return cls(**data["weights"])
+
+    def save(self, path: Path = DEFAULT_WEIGHTS_PATH, **metadata) -> None:
+        data = {"version": WEIGHTS_VERSION, "weights": asdict(self), **metadata}
+        Path(path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+DEFAULT_WEIGHTS = Weights()
+
+def _hits(hp: int, damage: int) -> int:
+    return min(-(-hp // damage), MAX_KO_TURNS) if damage > 0 else MAX_KO_TURNS
+
+def features(ai_hp: int, player_hp: int, ai_to_move: bool, ai_best: int, player_best: int,
+             ai_max_hp: int, player_max_hp: int) -> Tuple[float, ...]:
+    """Rasgos de un estado no terminal, en el orden de FEATURES."""
+    tempo = 0.5 if ai_to_move else -0.5
+    return (
+        ai_hp - player_hp,
+        100 * (ai_hp / ai_max_hp - player_hp / player_max_hp),
+        _hits(ai_hp, player_best) - _hits(player_hp, ai_best) + tempo,
+        100 * (min(ai_best / player_hp, 1.0) - min(player_best / ai_hp, 1.0)),
+    )
+
+class Evaluator:
+    """Evaluación de un enfrentamiento concreto: `evaluator(ai_hp, player_hp, ai_to_move)` -> puntaje de la IA."""
+    __slots__ = ("weights", "ai_best", "player_best", "ai_max_hp", "player_max_hp", "_limit")
+
+    def __init__(self, weights: Weights, ai_pokemon: Pokemon, player_pokemon: Pokemon):
+        self.weights = weights.as_tuple()
+        self.ai_best = max(damage_table(ai_pokemon, player_pokemon), default=0)
+        self.player_best = max(damage_table(player_pokemon, ai_pokemon), default=0)
+        self.ai_max_hp = ai_pokemon.max_hp
+        self.player_max_hp = player_pokemon.max_hp
+        # Un estado no terminal nunca debe valer lo mismo que una victoria.
+        self._limit = WIN_SCORE - 1
+
+    def features(self, ai_hp: int, player_hp: int, ai_to_move: bool) -> Tuple[float, ...]:
+        return features(ai_hp, player_hp, ai_to_move, self.ai_best, self.player_best,
+                        self.ai_max_hp, self.player_max_hp)
+
+    def __call__(self, ai_hp: int, player_hp: int, ai_to_move: bool) -> int:
+        # Los mismos rasgos con los que game.tune ajusta los pesos.
+        score = sum(w * f for w, f in zip(self.weights, self.features(ai_hp, player_hp, ai_to_move)))
+        return max(-self._limit, min(self._limit, int(math.floor(score + 0.5))))
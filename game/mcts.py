@@ -0,0 +1,180 @@
+# mcts.py
+"""Búsqueda de árbol Monte Carlo (UCT) sobre el estado compacto de PS.
+
+Cada iteración baja por el árbol eligiendo ataques con UCB1, sortea el
+resultado del golpe, agrega un nodo nuevo y termina el combate con jugadas al
+azar. El ataque elegido es el más visitado en la raíz. Sirve igual con daño
+determinista que con un Ruleset, porque el azar solo aparece al sortear.
+
+Con `workers > 1` se paraleliza por raíz: cada proceso construye su propio
+árbol desde el mismo estado y se suman las visitas de los ataques de la raíz.
+"""
+import math
+import random
+import time
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from .minimax import StochasticMatchup
+
+DEFAULT_ITERATIONS = 2000
+DEFAULT_EXPLORATION = 1.4
+# Jugadas (árbol más simulación al azar) tras las que una iteración se corta y cuenta como empate.
+MAX_PLAYOUT_PLIES = 200
+
+Outcomes = Tuple[Tuple[Tuple[float, ...], Tuple[int, ...]], ...]
+
+def compile_outcomes(matchup) -> Tuple[Outcomes, Outcomes]:
+    """Por bando y ataque: probabilidades acumuladas y daños, listos para sortear con bisect."""
+    if isinstance(matchup, StochasticMatchup):
+        sides = (matchup.ai_outcomes, matchup.player_outcomes)
+    else:
+        sides = tuple(tuple(((1.0, damage),) for damage in damages)
+                      for damages in (matchup.ai_damage, matchup.player_damage))
+    return tuple(
+        tuple((tuple(accumulate(p for p, _ in attack)), tuple(d for _, d in attack)) for attack in side)
+        for side in sides
+    )
+
+def _sample(outcome, rng: random.Random) -> int:
+    cumulative, damages = outcome
+    return damages[min(bisect(cumulative, rng.random() * cumulative[-1]), len(damages) - 1)]
+
+class Node:
+    """Estado del árbol. Las estadísticas de cada ataque se guardan en el nodo desde el que se usa."""
+    __slots__ = ("ai_hp", "player_hp", "ai_to_move", "visits", "action_visits", "action_wins", "children")
+
+    def __init__(self, ai_hp: int, player_hp: int, ai_to_move: bool, actions: int):
+        self.ai_hp = ai_hp
+        self.player_hp = player_hp
+        self.ai_to_move = ai_to_move
+        self.visits = 0
+        self.action_visits = [0] * actions
+        # Victorias (1 por victoria, 0.5 por empate) desde el punto de vista de quien mueve en este nodo.
+        self.action_wins = [0.0] * actions
+        # Un diccionario por ataque: (PS IA, PS jugador) tras el golpe -> nodo hijo.
+        self.children: List[Dict[Tuple[int, int], "Node"]] = [{} for _ in range(actions)]
+
+    def find(self, ai_hp: int, player_hp: int, ai_to_move: bool, plies: int = 2) -> Optional["Node"]:
+        """Nodo descendiente con ese estado a lo sumo `plies` jugadas más abajo."""
+        if (self.ai_hp, self.player_hp, self.ai_to_move) == (ai_hp, player_hp, ai_to_move):
+            return self
+        if plies == 0:
+            return None
+        for children in self.children:
+            for child in children.values():
+                found = child.find(ai_hp, player_hp, ai_to_move, plies - 1)
+                if found is not None:
+                    return found
+        return None
+
+class Tree:
+    def __init__(self, outcomes: Tuple[Outcomes, Outcomes], root: Node, exploration: float = DEFAULT_EXPLORATION,
+                 rng: Optional[random.Random] = None):
+        self.outcomes = outcomes
+        self.root = root
+        self.exploration = exploration
+        self.rng = rng or random.Random()
+        # Si ningún bando puede hacer daño el combate nunca termina: todo es empate.
+        self.stalemate = all(max(damages) == 0 for side in outcomes for _, damages in side)
+
+    def _new_node(self, ai_hp: int, player_hp: int, ai_to_move: bool) -> Node:
+        return Node(ai_hp, player_hp, ai_to_move, len(self.outcomes[0 if ai_to_move else 1]))
+
+    def _select(self, node: Node) -> int:
+        visits = node.action_visits
+        for action, count in enumerate(visits):
+            if count == 0:
+                return action
+        log_total = math.log(node.visits)
+        wins = node.action_wins
+        c = self.exploration
+        return max(range(len(visits)), key=lambda a: wins[a] / visits[a] + c * math.sqrt(log_total / visits[a]))
+
+    def _playout(self, ai_hp: int, player_hp: int, ai_to_move: bool, plies: int) -> float:
+        """Termina el combate al azar en a lo sumo `plies` jugadas; 1 si gana la IA, 0 si pierde, 0.5 si se corta."""
+        rng = self.rng
+        ai_side, player_side = self.outcomes
+        for _ in range(plies):
+            if player_hp <= 0:
+                return 1.0
+            if ai_hp <= 0:
+                return 0.0
+            if ai_to_move:
+                player_hp -= _sample(ai_side[rng.randrange(len(ai_side))], rng)
+            else:
+                ai_hp -= _sample(player_side[rng.randrange(len(player_side))], rng)
+            ai_to_move = not ai_to_move
+        return 1.0 if player_hp <= 0 else 0.0 if ai_hp <= 0 else 0.5
+
+    def iterate(self) -> None:
+        node = self.root
+        path: List[Tuple[Node, int]] = []
+        while True:
+            if node.player_hp <= 0:
+                result = 1.0
+                break
+            if node.ai_hp <= 0:
+                result = 0.0
+                break
+            if self.stalemate or len(path) >= MAX_PLAYOUT_PLIES:
+                result = 0.5
+                break
+            action = self._select(node)
+            path.append((node, action))
+            side = self.outcomes[0 if node.ai_to_move else 1]
+            damage = _sample(side[action], self.rng)
+            if node.ai_to_move:
+                state = (node.ai_hp, node.player_hp - damage)
+            else:
+                state = (node.ai_hp - damage, node.player_hp)
+            children = node.children[action]
+            child = children.get(state)
+            if child is None:
+                children[state] = self._new_node(state[0], state[1], not node.ai_to_move)
+                result = self._playout(state[0], state[1], not node.ai_to_move, MAX_PLAYOUT_PLIES - len(path))
+                break
+            node = child
+        for parent, action in path:
+            parent.visits += 1
+            parent.action_visits[action] += 1
+            parent.action_wins[action] += result if parent.ai_to_move else 1.0 - result
+
+    def run(self, iterations: int, deadline: Optional[float] = None) -> None:
+        for n in range(iterations):
+            # Consultar el reloj cada pocas iteraciones cuesta menos que hacerlo en todas.
+            if deadline is not None and n % 64 == 0 and time.perf_counter() > deadline:
+                break
+            self.iterate()
+
+def best_action(visits: List[int]) -> int:
+    """El ataque más visitado; ante empates, el de menor índice."""
+    return max(range(len(visits)), key=lambda a: (visits[a], -a))
+
+def _worker_search(args) -> List[int]:
+    outcomes, ai_hp, player_hp, iterations, time_budget_ms, exploration, seed = args
+    deadline = time.perf_counter() + time_budget_ms / 1000 if time_budget_ms is not None else None
+    tree = Tree(outcomes, Node(ai_hp, player_hp, True, len(outcomes[0])), exploration, random.Random(seed))
+    tree.run(iterations, deadline)
+    return tree.root.action_visits
+
+def parallel_search(pool: ProcessPoolExecutor, workers: int, outcomes: Tuple[Outcomes, Outcomes],
+                    ai_hp: int, player_hp: int, iterations: int, time_budget_ms: Optional[float],
+                    exploration: float, seed: int) -> List[int]:
+    """Paralelización por raíz: visitas sumadas de `workers` árboles independientes."""
+    share = max(1, iterations // workers)
+    jobs = [(outcomes, ai_hp, player_hp, share, time_budget_ms, exploration, seed + i) for i in range(workers)]
+    totals = [0] * len(outcomes[0])
+    for visits in pool.map(_worker_search, jobs):
+        for action, count in enumerate(visits):
+            totals[action] += count
+    return totals
+
+def mcts_decision(matchup, ai_hp: int, player_hp: int, iterations: int = DEFAULT_ITERATIONS,
+                  exploration: float = DEFAULT_EXPLORATION, seed: Optional[int] = None) -> int:
+    """Búsqueda de un solo uso, sin reutilizar el árbol; acepta Matchup o StochasticMatchup."""
+    outcomes = compile_outcomes(matchup)
+    tree = Tree(outcomes, Node(ai_hp, player_hp, True, len(outcomes[0])), exploration, random.Random(seed))
+    tree.run(iterations)
+    return best_action(tree.root.action_visits)
@@ -1,55 +1,566 @@
 # minimax.py
-from typing import Tuple
-from .pokemon import Pokemon, Attack, calculate_damage, is_fainted
-import copy
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .pokemon import Pokemon, Ruleset, damage_table
+from .search_stats import SearchStats
+from .transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+if TYPE_CHECKING:
+    from .evaluation import Weights
 
 MAX_DEPTH = 2
+MAX_ITERATIVE_DEPTH = 64
+WIN_SCORE = 9999
+# Profundidad restante desde la que los ataques después del primero se prueban con ventana nula.
+# Con cuatro ataques por lado y árboles poco profundos las re-búsquedas cuestan más de lo que ahorran.
+PVS_MIN_DEPTH = 6
+_INFINITY = WIN_SCORE + 1
+# Jugadas (de ambos bandos) que mira la búsqueda con azar; cada una agrega un nodo de azar.
+CHANCE_DEPTH = 4
+
+class Matchup:
+    """Datos estáticos de un enfrentamiento: el daño de cada ataque de cada lado.
+
+    Durante la búsqueda solo cambian los PS, así que el daño se calcula una vez
+    y los nodos del árbol se representan únicamente con enteros. Con `weights`
+    las hojas se evalúan con game.evaluation en lugar de la diferencia de PS.
+    """
+    __slots__ = ("ai_damage", "player_damage", "evaluate")
+
+    def __init__(self, ai_pokemon: Pokemon, player_pokemon: Pokemon, weights: Optional["Weights"] = None):
+        self.ai_damage = damage_table(ai_pokemon, player_pokemon)
+        self.player_damage = damage_table(player_pokemon, ai_pokemon)
+        self.evaluate: Optional[Callable[[int, int, bool], int]] = None
+        if weights is not None:
+            from .evaluation import DEFAULT_WEIGHTS, Evaluator  # evaluation importa este módulo
+
+            if weights != DEFAULT_WEIGHTS:
+                self.evaluate = Evaluator(weights, ai_pokemon, player_pokemon)
+
+class StochasticMatchup:
+    """Como Matchup, pero cada ataque es una distribución de (probabilidad, daño) según un Ruleset."""
+    __slots__ = ("ai_outcomes", "player_outcomes", "ai_order", "player_order")
+
+    def __init__(self, ai_pokemon: Pokemon, player_pokemon: Pokemon, rules: Ruleset):
+        self.ai_outcomes = _attack_outcomes(ai_pokemon, player_pokemon, rules)
+        self.player_outcomes = _attack_outcomes(player_pokemon, ai_pokemon, rules)
+        # Primero el ataque con más daño esperado: suele ser el mejor y ajusta antes las ventanas.
+        self.ai_order = _expected_damage_order(self.ai_outcomes)
+        self.player_order = _expected_damage_order(self.player_outcomes)
+
+def _attack_outcomes(attacker: Pokemon, defender: Pokemon, rules: Ruleset) -> Tuple[Tuple[Tuple[float, int], ...], ...]:
+    return tuple(rules.outcomes(damage, attack.accuracy)
+                 for damage, attack in zip(damage_table(attacker, defender), attacker.attacks))
+
+def _expected_damage_order(outcomes: Tuple[Tuple[Tuple[float, int], ...], ...]) -> Tuple[int, ...]:
+    return tuple(sorted(range(len(outcomes)), key=lambda i: -sum(p * d for p, d in outcomes[i])))
+
+class SearchState(NamedTuple):
+    ai_hp: int
+    player_hp: int
+    ai_to_move: bool
+
+def evaluate_hp(ai_hp: int, player_hp: int) -> int:
+    if player_hp <= 0:
+        return WIN_SCORE
+    if ai_hp <= 0:
+        return -WIN_SCORE
+    return ai_hp - player_hp
 
 def evaluate_state(ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
-    if is_fainted(player_pokemon):
-        return 9999
-    if is_fainted(ai_pokemon):
-        return -9999
-    return ai_pokemon.current_hp - player_pokemon.current_hp
+    return evaluate_hp(ai_pokemon.current_hp, player_pokemon.current_hp)
 
-def minimax(ai_pokemon: Pokemon, player_pokemon: Pokemon, depth: int, is_maximizing: bool, alpha: int, beta: int) -> int:
-    if depth == 0 or is_fainted(ai_pokemon) or is_fainted(player_pokemon):
-        return evaluate_state(ai_pokemon, player_pokemon)
-
-    if is_maximizing:
-        max_eval = -float('inf')
-        for attack in ai_pokemon.attacks:
-            new_player = copy.deepcopy(player_pokemon)
-            damage = calculate_damage(ai_pokemon, new_player, attack)
-            new_player.current_hp -= damage
-            eval = minimax(ai_pokemon, new_player, depth - 1, False, alpha, beta)
-            max_eval = max(max_eval, eval)
-            alpha = max(alpha, eval)
-            if beta <= alpha:
+def _move_order(count: int, first: int) -> Tuple[int, ...]:
+    if first <= 0 or first >= count:  # -1: sin preferencia
+        return tuple(range(count))
+    return (first,) + tuple(i for i in range(count) if i != first)
+
+class SearchContext:
+    """Información de búsqueda que un combate conserva entre turnos.
+
+    Guarda la tabla de transposición, la variante principal esperada (ataques
+    alternados desde el turno actual de la IA), los movimientos killer por ply y
+    la puntuación histórica de cada ataque, para ordenar primero los ataques que
+    ya produjeron cortes y que la poda ocurra antes. Si `aspiration_window` es
+    positivo, el último puntaje de la raíz centra una ventana de aspiración para
+    la búsqueda siguiente.
+    """
+
+    def __init__(self, tt: Optional[TranspositionTable] = None, aspiration_window: int = 0):
+        self.tt = tt if tt is not None else TranspositionTable()
+        # Semiancho en PS de la ventana de aspiración; 0 la desactiva.
+        self.aspiration_window = aspiration_window
+        self.pv: List[int] = []
+        self.killers: List[List[int]] = []
+        self.history: Dict[Tuple[bool, int], int] = {}
+        self.score: Optional[int] = None
+
+    def record_move(self, index: int) -> None:
+        """Avanza la raíz una jugada real (de cualquiera de los dos lados)."""
+        self.pv = self.pv[1:] if self.pv and self.pv[0] == index else []
+        self.killers = self.killers[1:]
+
+    def branch(self, *moves: int) -> "SearchContext":
+        """Copia para buscar en otro hilo tras las jugadas `moves`.
+
+        Comparte la tabla y la historia (que solo toca el hilo que busca) pero
+        tiene su propia variante principal y killers, así record_move en el hilo
+        principal no interfiere con una búsqueda en curso.
+        """
+        child = SearchContext(self.tt, self.aspiration_window)
+        child.history = self.history
+        child.pv = list(self.pv)
+        child.killers = [list(k) for k in self.killers]
+        child.score = self.score
+        for index in moves:
+            child.record_move(index)
+        return child
+
+    def adopt(self, other: "SearchContext") -> None:
+        """Toma la variante principal, los killers y el puntaje de una rama ya terminada."""
+        self.pv = list(other.pv)
+        self.killers = [list(k) for k in other.killers]
+        self.score = other.score
+
+    def begin_search(self) -> None:
+        # La historia antigua pesa menos que la del turno actual.
+        for key in self.history:
+            self.history[key] //= 2
+
+    def order(self, count: int, ply: int, is_maximizing: bool, tt_move: int) -> List[int]:
+        pv_move = self.pv[ply] if ply < len(self.pv) else -1
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+        return sorted(range(count), key=lambda i: (i != tt_move, i != pv_move, i not in killers,
+                                                    -history.get((is_maximizing, i), 0)))
+
+    def record_cutoff(self, ply: int, is_maximizing: bool, move: int, depth: int) -> None:
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        key = (is_maximizing, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+class _SearchTimeout(Exception):
+    pass
+
+class _Search:
+    """Búsqueda negamax con PVS sobre un Matchup, con tabla de transposición, contexto, límite de
+    tiempo y estadísticas opcionales.
+
+    Los puntajes de `negamax` son desde el punto de vista del bando que mueve; la raíz y las
+    funciones públicas los devuelven siempre desde el punto de vista de la IA.
+    """
+    __slots__ = ("matchup", "tt", "context", "deadline", "stats", "reached_horizon")
+
+    def __init__(self, matchup: Matchup, tt: Optional[TranspositionTable] = None,
+                 context: Optional[SearchContext] = None, deadline: Optional[float] = None,
+                 stats: Optional[SearchStats] = None):
+        self.matchup = matchup
+        self.context = context
+        self.tt = tt if tt is not None or context is None else context.tt
+        self.deadline = deadline
+        self.stats = stats
+        # Queda en False si todas las hojas fueron estados terminales: buscar más profundo no cambia nada.
+        self.reached_horizon = False
+
+    def negamax(self, ai_hp: int, player_hp: int, depth: int, ai_to_move: bool, alpha: int, beta: int,
+                ply: int = 1) -> int:
+        stats = self.stats
+        if stats is not None:
+            stats.visit(ply)
+        if player_hp <= 0:
+            return WIN_SCORE if ai_to_move else -WIN_SCORE
+        if ai_hp <= 0:
+            return -WIN_SCORE if ai_to_move else WIN_SCORE
+        if depth == 0:
+            self.reached_horizon = True
+            evaluate = self.matchup.evaluate
+            if evaluate is None:
+                return ai_hp - player_hp if ai_to_move else player_hp - ai_hp
+            score = evaluate(ai_hp, player_hp, ai_to_move)
+            return score if ai_to_move else -score
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise _SearchTimeout
+
+        damages = self.matchup.ai_damage if ai_to_move else self.matchup.player_damage
+        order = range(len(damages))
+        tt = self.tt
+        tt_move = -1
+        if tt is not None:
+            key = (ai_hp, player_hp, ai_to_move)
+            entry = tt.lookup(key, depth)
+            if entry is not None:
+                if abs(entry.score) != WIN_SCORE:
+                    self.reached_horizon = True
+                if entry.flag == EXACT:
+                    return entry.score
+                if entry.flag == LOWER_BOUND and entry.score >= beta:
+                    return entry.score
+                if entry.flag == UPPER_BOUND and entry.score <= alpha:
+                    return entry.score
+            else:
+                entry = tt.probe(key)
+            if entry is not None:
+                tt_move = entry.best_move
+                order = _move_order(len(damages), tt_move)
+            alpha_orig = alpha
+        context = self.context
+        if context is not None:
+            order = context.order(len(damages), ply, ai_to_move, tt_move)
+
+        best = -_INFINITY
+        best_move = 0
+        first = True
+        for i in order:
+            if ai_to_move:
+                child_ai, child_player = ai_hp, player_hp - damages[i]
+            else:
+                child_ai, child_player = ai_hp - damages[i], player_hp
+            if first or depth < PVS_MIN_DEPTH:
+                score = -self.negamax(child_ai, child_player, depth - 1, not ai_to_move, -beta, -alpha, ply + 1)
+                first = False
+            else:
+                # Ventana nula: solo se comprueba si el ataque supera al mejor; si lo hace, se busca de nuevo.
+                score = -self.negamax(child_ai, child_player, depth - 1, not ai_to_move, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.negamax(child_ai, child_player, depth - 1, not ai_to_move, -beta, -alpha, ply + 1)
+            if score > best:
+                best = score
+                best_move = i
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if context is not None:
+                    context.record_cutoff(ply, ai_to_move, i, depth)
+                if stats is not None:
+                    stats.cutoff(i == order[0])
                 break
-        return max_eval
-    else:
-        min_eval = float('inf')
-        for attack in player_pokemon.attacks:
-            new_ai = copy.deepcopy(ai_pokemon)
-            damage = calculate_damage(player_pokemon, new_ai, attack)
-            new_ai.current_hp -= damage
-            eval = minimax(new_ai, player_pokemon, depth - 1, True, alpha, beta)
-            min_eval = min(min_eval, eval)
-            beta = min(beta, eval)
-            if beta <= alpha:
+
+        if tt is not None:
+            if best <= alpha_orig:
+                flag = UPPER_BOUND
+            elif best >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            tt.store(key, depth, flag, best, best_move)
+        return best
+
+    def root(self, ai_hp: int, player_hp: int, depth: int, first_move: int = -1,
+             guess: Optional[int] = None) -> Tuple[int, int]:
+        """Mejor ataque y puntaje exacto; ante empates gana el ataque de menor índice.
+
+        Si el contexto tiene ventana de aspiración, se busca primero alrededor de
+        `guess` y solo si el resultado cae fuera se abre la ventana.
+        """
+        context = self.context
+        if self.stats is not None:
+            self.stats.visit(0)
+        if first_move < 0 and context is not None and context.pv:
+            first_move = context.pv[0]
+        low, high = -_INFINITY, _INFINITY
+        window = context.aspiration_window if context is not None else 0
+        if window > 0 and guess is not None and abs(guess) < WIN_SCORE:
+            low, high = guess - window, guess + window
+        while True:
+            best_index, best_score = self._root_window(ai_hp, player_hp, depth, first_move, low, high)
+            if best_index >= 0:
                 break
-        return min_eval
+            # Fuera de la ventana: se abre solo el lado que falló, el otro queda acotado por el resultado.
+            if best_score >= high:
+                low, high = high - 1, _INFINITY
+            else:
+                low, high = -_INFINITY, low + 1
+        if context is not None:
+            context.score = best_score
+            pv = self.principal_variation(ai_hp, player_hp, depth, best_index)
+            # Una iteración poco profunda no debe borrar una variante más larga de la misma línea.
+            if context.pv[:len(pv)] != pv:
+                context.pv = pv
+        return best_index, best_score
 
-def minimax_decision(ai_pokemon: Pokemon, player_pokemon: Pokemon) -> int:
-    best_score = -float('inf')
+    def _root_window(self, ai_hp: int, player_hp: int, depth: int, first_move: int,
+                     low: int, high: int) -> Tuple[int, int]:
+        """Raíz dentro de (low, high). Si el valor real queda fuera de la ventana
+        devuelve índice -1 y la cota que lo demuestra.
+
+        Todos los hijos comparten alfa. Para respetar el desempate, un ataque de
+        índice menor que el mejor actual se busca con alfa = mejor - 1, así un
+        empate también cuenta como mejora; uno de índice mayor debe superarlo.
+        """
+        damages = self.matchup.ai_damage
+        best_score = None
+        best_index = -1
+        for i in _move_order(len(damages), first_move):
+            if best_score is None:
+                alpha = low
+            else:
+                alpha = best_score - 1 if i < best_index else best_score
+            score = -self.negamax(ai_hp, player_hp - damages[i], depth - 1, False, -high, -alpha)
+            if score >= high:
+                return -1, score
+            if score > alpha:
+                best_score = score
+                best_index = i
+        if best_score is None:
+            return -1, low
+        return best_index, best_score
+
+    def principal_variation(self, ai_hp: int, player_hp: int, depth: int, first_move: int) -> List[int]:
+        """Sigue los mejores ataques guardados en la tabla desde la raíz."""
+        pv = [first_move]
+        player_hp -= self.matchup.ai_damage[first_move]
+        is_maximizing = False
+        for remaining in range(depth - 1, 0, -1):
+            if ai_hp <= 0 or player_hp <= 0 or self.tt is None:
+                break
+            entry = self.tt.probe((ai_hp, player_hp, is_maximizing))
+            if entry is None or entry.depth != remaining:
+                break
+            pv.append(entry.best_move)
+            if is_maximizing:
+                player_hp -= self.matchup.ai_damage[entry.best_move]
+            else:
+                ai_hp -= self.matchup.player_damage[entry.best_move]
+            is_maximizing = not is_maximizing
+        return pv
+
+class _ChanceSearch:
+    """Expectiminimax en forma negamax, con poda Star1/Star2 en los nodos de azar.
+
+    Cada jugada es un nodo de decisión (el bando elige ataque) seguido de un nodo
+    de azar (el resultado del golpe). Como todo puntaje está entre -WIN_SCORE y
+    WIN_SCORE, un nodo de azar se puede descartar sin ver todos sus resultados:
+    Star1 acota con los resultados ya vistos y el peor o mejor caso del resto, y
+    Star2 antes prueba solo el primer ataque del rival en cada resultado para
+    obtener cotas superiores más ajustadas. Los puntajes son valores esperados.
+
+    Distintos órdenes de resultados llevan a los mismos PS, así que las cotas de
+    cada nodo de azar se guardan en un diccionario propio de la búsqueda; así
+    además las pruebas de Star2 no se repiten al buscar el nodo completo.
+    """
+    __slots__ = ("matchup", "stats", "bounds")
+
+    def __init__(self, matchup: StochasticMatchup, stats: Optional[SearchStats] = None):
+        self.matchup = matchup
+        self.stats = stats
+        # (PS IA, PS jugador, turno IA, profundidad, ataque) -> (cota inferior, cota superior)
+        self.bounds: Dict[Tuple[int, int, bool, int, int], Tuple[float, float]] = {}
+
+    def negamax(self, ai_hp: int, player_hp: int, depth: int, ai_to_move: bool, alpha: float, beta: float,
+                ply: int = 1) -> float:
+        stats = self.stats
+        if stats is not None:
+            stats.visit(ply)
+        if player_hp <= 0:
+            return WIN_SCORE if ai_to_move else -WIN_SCORE
+        if ai_hp <= 0:
+            return -WIN_SCORE if ai_to_move else WIN_SCORE
+        if depth == 0:
+            return ai_hp - player_hp if ai_to_move else player_hp - ai_hp
+
+        order = self.matchup.ai_order if ai_to_move else self.matchup.player_order
+        best = -_INFINITY
+        for i in order:
+            value = self.chance(ai_hp, player_hp, depth, ai_to_move, i, alpha, beta, ply)
+            if value > best:
+                best = value
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(i == order[0])
+                break
+        return best
+
+    def chance(self, ai_hp: int, player_hp: int, depth: int, ai_to_move: bool, move: int,
+               alpha: float, beta: float, ply: int) -> float:
+        """Valor esperado del ataque `move` para quien lo usa; fuera de (alpha, beta) solo es una cota."""
+        key = (ai_hp, player_hp, ai_to_move, depth, move)
+        lower, upper_bound = self.bounds.get(key, (-_INFINITY, _INFINITY))
+        if lower == upper_bound or lower >= beta:
+            return lower
+        if upper_bound <= alpha:
+            return upper_bound
+        value = self._chance(ai_hp, player_hp, depth, ai_to_move, move, alpha, beta, ply)
+        if value <= alpha:
+            upper_bound = min(upper_bound, value)
+        elif value >= beta:
+            lower = max(lower, value)
+        else:
+            lower = upper_bound = value
+        self.bounds[key] = (lower, upper_bound)
+        return value
+
+    def _chance(self, ai_hp: int, player_hp: int, depth: int, ai_to_move: bool, move: int,
+                alpha: float, beta: float, ply: int) -> float:
+        matchup = self.matchup
+        outcomes = (matchup.ai_outcomes if ai_to_move else matchup.player_outcomes)[move]
+        children = [(ai_hp, player_hp - damage) if ai_to_move else (ai_hp - damage, player_hp)
+                    for _, damage in outcomes]
+        upper = [WIN_SCORE] * len(outcomes)
+
+        if depth > 1:
+            # Star2: el primer ataque del rival en cada resultado acota por arriba el valor de ese resultado.
+            probe = matchup.player_order[0] if ai_to_move else matchup.ai_order[0]
+            known = 0.0
+            rest = 1.0
+            for k, (p, _) in enumerate(outcomes):
+                rest -= p
+                child_ai, child_player = children[k]
+                if child_ai > 0 and child_player > 0:
+                    # Basta con saber si el resultado queda por debajo de lo que necesita el nodo.
+                    need = (alpha - known - WIN_SCORE * rest) / p
+                    ceiling = min(max(-need, -WIN_SCORE), _INFINITY)
+                    reply = self.chance(child_ai, child_player, depth - 1, not ai_to_move, probe,
+                                        -_INFINITY, ceiling, ply + 1)
+                    upper[k] = min(WIN_SCORE, -reply)
+                known += p * upper[k]
+            if known <= alpha:
+                return known
+
+        # Star1: cada resultado se busca con la ventana que todavía puede cambiar el valor del nodo.
+        total = 0.0
+        upper_rest = sum(p * u for (p, _), u in zip(outcomes, upper))
+        lower_rest = -float(WIN_SCORE)
+        for k, (p, _) in enumerate(outcomes):
+            upper_rest -= p * upper[k]
+            lower_rest += p * WIN_SCORE
+            low = (alpha - total - upper_rest) / p
+            high = (beta - total - lower_rest) / p
+            child_ai, child_player = children[k]
+            value = -self.negamax(child_ai, child_player, depth - 1, not ai_to_move,
+                                  -min(high, _INFINITY), -max(low, -_INFINITY), ply + 1)
+            total += p * value
+            if value <= low:
+                return total + upper_rest
+            if value >= high:
+                return total + lower_rest
+        return total
+
+def _window_search(search: "_Search", ai_hp: int, player_hp: int, depth: int, ai_to_move: bool, alpha, beta) -> int:
+    """Puntaje desde el punto de vista de la IA con una ventana (alpha, beta) también de la IA."""
+    alpha = max(alpha, -_INFINITY)
+    beta = min(beta, _INFINITY)
+    if ai_to_move:
+        return search.negamax(ai_hp, player_hp, depth, True, alpha, beta)
+    return -search.negamax(ai_hp, player_hp, depth, False, -beta, -alpha)
+
+def search(matchup: Matchup, state: SearchState, depth: int, alpha=-float('inf'), beta=float('inf'),
+           tt: Optional[TranspositionTable] = None) -> int:
+    return _window_search(_Search(matchup, tt), state.ai_hp, state.player_hp, depth, state.ai_to_move, alpha, beta)
+
+def minimax(ai_pokemon: Pokemon, player_pokemon: Pokemon, depth: int, is_maximizing: bool, alpha: int, beta: int) -> int:
+    matchup = Matchup(ai_pokemon, player_pokemon)
+    return _window_search(_Search(matchup), ai_pokemon.current_hp, player_pokemon.current_hp, depth, is_maximizing,
+                          alpha, beta)
+
+def root_search(matchup: Matchup, ai_hp: int, player_hp: int, depth: int = MAX_DEPTH,
+                tt: Optional[TranspositionTable] = None,
+                context: Optional[SearchContext] = None,
+                stats: Optional[SearchStats] = None) -> Tuple[int, int]:
+    """Devuelve (índice del mejor ataque, puntaje) para la IA en el estado dado.
+
+    `tt` y `context` solo deben compartirse entre búsquedas del mismo
+    enfrentamiento; si se pasa un contexto se usa su tabla.
+    """
+    if context is not None:
+        context.begin_search()
+    search = _Search(matchup, tt, context, stats=stats)
+    if stats is not None:
+        stats.start(search.tt)
+    # El puntaje del turno anterior sirve como centro de la ventana de aspiración.
+    guess = context.score if context is not None else None
+    best_index, best_score = search.root(ai_hp, player_hp, depth, guess=guess)
+    if stats is not None:
+        stats.finish(best_index, best_score, depth)
+    return best_index, best_score
+
+def iterative_deepening(matchup: Matchup, ai_hp: int, player_hp: int, time_budget_ms: float,
+                        tt: Optional[TranspositionTable] = None,
+                        max_depth: int = MAX_ITERATIVE_DEPTH,
+                        context: Optional[SearchContext] = None,
+                        stats: Optional[SearchStats] = None) -> Tuple[int, int, int]:
+    """Profundiza de a un nivel hasta agotar `time_budget_ms`.
+
+    Devuelve (índice, puntaje, profundidad) de la última iteración completa. Cada
+    iteración prueba primero el mejor ataque de la anterior, con una ventana de
+    aspiración alrededor de su puntaje; la profundidad 1 se completa siempre para
+    tener una jugada aunque el presupuesto sea mínimo.
+    """
+    if context is not None:
+        context.begin_search()
+    search = _Search(matchup, tt, context, stats=stats)
+    if stats is not None:
+        stats.start(search.tt)
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    best_index, best_score = search.root(ai_hp, player_hp, 1)
+    completed = 1
+    search.deadline = deadline
+    while search.reached_horizon and completed < max_depth:
+        search.reached_horizon = False
+        try:
+            best_index, best_score = search.root(ai_hp, player_hp, completed + 1, best_index, guess=best_score)
+        except _SearchTimeout:
+            break
+        completed += 1
+    if stats is not None:
+        stats.finish(best_index, best_score, completed)
+    return best_index, best_score, completed
+
+def minimax_decision(ai_pokemon: Pokemon, player_pokemon: Pokemon, depth: int = MAX_DEPTH,
+                     tt: Optional[TranspositionTable] = None,
+                     context: Optional[SearchContext] = None,
+                     stats: Optional[SearchStats] = None,
+                     weights: Optional["Weights"] = None) -> int:
+    matchup = Matchup(ai_pokemon, player_pokemon, weights)
+    return root_search(matchup, ai_pokemon.current_hp, player_pokemon.current_hp, depth, tt, context, stats)[0]
+
+def timed_decision(ai_pokemon: Pokemon, player_pokemon: Pokemon, time_budget_ms: float,
+                   tt: Optional[TranspositionTable] = None,
+                   context: Optional[SearchContext] = None,
+                   stats: Optional[SearchStats] = None,
+                   weights: Optional["Weights"] = None) -> int:
+    matchup = Matchup(ai_pokemon, player_pokemon, weights)
+    return iterative_deepening(matchup, ai_pokemon.current_hp, player_pokemon.current_hp, time_budget_ms, tt,
+                               context=context, stats=stats)[0]
+
+def decision_with_stats(ai_pokemon: Pokemon, player_pokemon: Pokemon, depth: int = MAX_DEPTH,
+                        time_budget_ms: Optional[float] = None,
+                        context: Optional[SearchContext] = None,
+                        weights: Optional["Weights"] = None) -> Tuple[int, SearchStats]:
+    """Como minimax_decision (o timed_decision si hay presupuesto), devolviendo también las estadísticas."""
+    stats = SearchStats()
+    if time_budget_ms is None:
+        index = minimax_decision(ai_pokemon, player_pokemon, depth, context=context, stats=stats, weights=weights)
+    else:
+        index = timed_decision(ai_pokemon, player_pokemon, time_budget_ms, context=context, stats=stats,
+                               weights=weights)
+    return index, stats
+
+def expectiminimax(matchup: StochasticMatchup, ai_hp: int, player_hp: int, depth: int = CHANCE_DEPTH,
+                   stats: Optional[SearchStats] = None) -> Tuple[int, float]:
+    """(índice del mejor ataque, valor esperado) para la IA; ante empates gana el de menor índice."""
+    search = _ChanceSearch(matchup, stats)
+    if stats is not None:
+        stats.start(None)
+        stats.visit(0)
     best_index = 0
-    for i, attack in enumerate(ai_pokemon.attacks):
-        simulated_player = copy.deepcopy(player_pokemon)
-        damage = calculate_damage(ai_pokemon, simulated_player, attack)
-        simulated_player.current_hp -= damage
-        score = minimax(ai_pokemon, simulated_player, MAX_DEPTH - 1, False, -float('inf'), float('inf'))
-        if score > best_score:
-            best_score = score
-            best_index = i
-    return best_index
+    best_score = -float('inf')
+    for i in range(len(matchup.ai_outcomes)):
+        alpha = -_INFINITY if i == 0 else best_score
+        score = search.chance(ai_hp, player_hp, depth, True, i, alpha, _INFINITY, 1)
+        if i == 0 or score > best_score:
+            best_index, best_score = i, score
+    if stats is not None:
+        stats.finish(best_index, best_score, depth)
+    return best_index, best_score
+
+def expectiminimax_decision(ai_pokemon: Pokemon, player_pokemon: Pokemon, rules: Ruleset,
+                            depth: int = CHANCE_DEPTH, stats: Optional[SearchStats] = None) -> int:
+    matchup = StochasticMatchup(ai_pokemon, player_pokemon, rules)
+    return expectiminimax(matchup, ai_pokemon.current_hp, player_pokemon.current_hp, depth, stats)[0]
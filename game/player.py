@@ -1,6 +1,7 @@
-from typing import List
-from .pokemon import Pokemon, Attack, calculate_damage
-from .minimax import minimax_decision
+from typing import Optional
+from .pokemon import Pokemon, Attack
+from .engines import Engine, MinimaxEngine
+from .search_stats import SearchStats
 
 class Player:
     def __init__(self, pokemon: Pokemon):
@@ -26,6 +27,14 @@ class HumanPlayer(Player):
                 print("Entrada inválida. Ingresa un número.")
 
 class AIPlayer(Player):
+    def __init__(self, pokemon: Pokemon, engine: Optional[Engine] = None):
+        super().__init__(pokemon)
+        # El algoritmo lo decide el motor (ver game.engines); por defecto, minimax a MAX_DEPTH.
+        self.engine = engine if engine is not None else MinimaxEngine()
+
+    @property
+    def last_stats(self) -> Optional[SearchStats]:
+        return self.engine.last_stats
+
     def choose_attack(self, opponent_pokemon: Pokemon) -> Attack:
-        index = minimax_decision(self.pokemon, opponent_pokemon)
-        return self.pokemon.attacks[index]
+        return self.pokemon.attacks[self.engine.choose(self.pokemon, opponent_pokemon)]
@@ -1,7 +1,8 @@
 import csv
-import pygame
+import random
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Tuple
+from typing import Dict, List, Literal, Mapping, NamedTuple, Optional, Tuple, get_args
 from dataclasses import dataclass
 
 PokemonType = Literal[
@@ -10,11 +11,12 @@ PokemonType = Literal[
     'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark'
 ]
 
-@dataclass
+@dataclass(frozen=True)
 class Attack:
     name: str
     type: PokemonType
     power: int
+    accuracy: int = 100  # porcentaje; solo cuenta con un Ruleset
 
 @dataclass
 class Pokemon:
@@ -23,16 +25,10 @@ class Pokemon:
     max_hp: int
     current_hp: int
     attacks: List[Attack]
-    image: Optional[pygame.Surface] = None
+    # Solo los nombres de archivo: las imágenes las carga la interfaz (ui.assets) cuando las necesita.
+    image_name: Optional[str] = None
     sprite_pos: Tuple[int, int] = (0, 0)
-    card_image: Optional[pygame.Surface] = None
-
-    def __getstate__(self):
-        """Evita copiar superficies de Pygame en deepcopy."""
-        state = self.__dict__.copy()
-        state.pop("image", None)
-        state.pop("card_image", None)
-        return state
+    card_image_name: Optional[str] = None
 
 EFFECTIVITY_TABLE: Dict[PokemonType, Dict[PokemonType, float]] = {
     'normal': {'rock': 0.5, 'ghost': 0},
@@ -53,76 +49,123 @@ EFFECTIVITY_TABLE: Dict[PokemonType, Dict[PokemonType, float]] = {
     'dark': {'psychic': 2, 'ghost': 2, 'fighting': 0.5, 'dark': 0.5}
 }
 
+POKEMON_TYPES: Tuple[PokemonType, ...] = get_args(PokemonType)
+TYPE_IDS: Dict[str, int] = {t: i for i, t in enumerate(POKEMON_TYPES)}
+NUM_TYPES = len(POKEMON_TYPES)
+# Tipos posteriores a la primera generación que el roster usa pero la tabla no cubre: son neutros.
+NEUTRAL_TYPES: Tuple[str, ...] = ('fairy',)
+KNOWN_TYPES = frozenset(POKEMON_TYPES) | frozenset(NEUTRAL_TYPES)
+
+def _compile_effectivity(table: Dict[PokemonType, Dict[PokemonType, float]]) -> List[float]:
+    """Convierte la tabla anidada en una matriz densa NUM_TYPES x NUM_TYPES aplanada."""
+    matrix = [1.0] * (NUM_TYPES * NUM_TYPES)
+    for attack_type, row in table.items():
+        base = TYPE_IDS[attack_type] * NUM_TYPES
+        for defender_type, multiplier in row.items():
+            matrix[base + TYPE_IDS[defender_type]] = float(multiplier)
+    return matrix
+
+# Índice: TYPE_IDS[tipo_ataque] * NUM_TYPES + TYPE_IDS[tipo_defensor]
+EFFECTIVITY_MATRIX: List[float] = _compile_effectivity(EFFECTIVITY_TABLE)
+
+class PokemonDataError(ValueError):
+    """Datos del roster ausentes o mal formados (CSV o snapshot)."""
+
+REQUIRED_COLUMNS = ('name', 'type1', 'hp', 'attack1', 'attack1_type', 'attack1_power',
+                    'attack2', 'attack2_type', 'attack2_power')
+
+def _type(row: Dict[str, str], column: str) -> str:
+    value = row[column].strip().lower()
+    if value not in KNOWN_TYPES:
+        raise ValueError(f"Tipo desconocido en {column}: {row[column]!r}")
+    return value
+
+def parse_csv(csv_path: Path) -> Dict[str, Pokemon]:
+    """Roster de la primera generación leído del CSV; cualquier fila inválida es un error."""
+    pokemon_db = {}
+    with open(csv_path, mode='r', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        try:
+            for row in reader:
+                # DictReader rellena con None las columnas que faltan en una fila corta.
+                missing = [column for column in REQUIRED_COLUMNS if row.get(column) is None]
+                if missing:
+                    raise ValueError(f"Faltan columnas: {', '.join(missing)}")
+                if int(row.get('generation', '1')) != 1:
+                    continue
+                types = [_type(row, 'type1')]
+                if row.get('type2'):
+                    types.append(_type(row, 'type2'))
+                hp = int(row['hp']) * 3
+                if hp <= 0:
+                    raise ValueError(f"PS no positivos: {row['hp']}")
+                pokemon_db[row['name'].lower()] = Pokemon(
+                    name=row['name'],
+                    types=types,
+                    max_hp=hp,
+                    current_hp=hp,
+                    attacks=[
+                        Attack(
+                            name=row['attack1'],
+                            type=_type(row, 'attack1_type'),
+                            power=int(row['attack1_power']),
+                            accuracy=int(row.get('attack1_accuracy') or 100)
+                        ),
+                        Attack(
+                            name=row['attack2'],
+                            type=_type(row, 'attack2_type'),
+                            power=int(row['attack2_power']),
+                            accuracy=int(row.get('attack2_accuracy') or 100)
+                        )
+                    ],
+                    image_name=row.get('image', f"{row['name'].lower()}.png"),
+                    card_image_name=row.get('card_image', f"{row['name'].lower()}_card.png"),
+                    sprite_pos=(int(row.get('sprite_x', 0)), int(row.get('sprite_y', 0)))
+                )
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise PokemonDataError(f"{csv_path}, línea {reader.line_num}: {e!r}") from e
+    return pokemon_db
+
 class PokemonLoader:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data"
-        self.images_dir = self.data_dir / "images"
         self.csv_path = self.data_dir / "pokemon.csv"
-        self.images_dir.mkdir(parents=True, exist_ok=True)
-        self.pokemon_db: Dict[str, Pokemon] = self._load_db()
-
-    def _load_image(self, image_name: str) -> Optional[pygame.Surface]:
-        path = self.images_dir / image_name
-        if path.exists():
-            return pygame.image.load(str(path))
-        return None
-
-    def _load_image_from_subdir(self, subfolder: str, image_name: str) -> Optional[pygame.Surface]:
-        path = self.images_dir / subfolder / image_name
-        if path.exists():
-            return pygame.image.load(str(path))
-        return None
-
-    def _load_db(self) -> Dict[str, Pokemon]:
-        pokemon_db = {}
-        try:
-            with open(self.csv_path, mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if int(row.get('generation', '1')) != 1:
-                        continue
-                    types = [row['type1'].lower()]
-                    if row.get('type2'):
-                        types.append(row['type2'].lower())
-                    pokemon_db[row['name'].lower()] = Pokemon(
-                        name=row['name'],
-                        types=types,
-                        max_hp=int(row['hp']) * 3,
-                        current_hp=int(row['hp']) * 3,
-                        attacks=[
-                            Attack(
-                                name=row['attack1'],
-                                type=row['attack1_type'].lower(),
-                                power=int(row['attack1_power'])
-                            ),
-                            Attack(
-                                name=row['attack2'],
-                                type=row['attack2_type'].lower(),
-                                power=int(row['attack2_power'])
-                            )
-                        ],
-                        image=self._load_image(row.get('image', f"{row['name'].lower()}.png")),
-                        card_image=self._load_image_from_subdir("cards", row.get('card_image', f"{row['name'].lower()}_card.png")),
-                        sprite_pos=(int(row.get('sprite_x', 0)), int(row.get('sprite_y', 0)))
-                    )
-        except Exception as e:
-            print(f"[ERROR] Error al cargar CSV: {e}")
-        return pokemon_db
+        self.snapshot_path = self.data_dir / "pokemon.snapshot"
+        self._db: Optional[Mapping[str, Pokemon]] = None
+
+    @property
+    def pokemon_db(self) -> Mapping[str, Pokemon]:
+        # Se carga al primer uso: game.snapshot importa este módulo y así no hay importación circular.
+        if self._db is None:
+            self._db = self._load_db()
+        return self._db
+
+    def _load_db(self) -> Mapping[str, Pokemon]:
+        """Roster desde el snapshot compilado (ver game.snapshot) o, si no lo hay o está obsoleto, desde el CSV."""
+        from .snapshot import open_snapshot
+
+        roster = open_snapshot(self.snapshot_path, self.csv_path)
+        if roster is not None:
+            return roster
+        if not self.csv_path.exists():
+            raise PokemonDataError(f"No se encontró {self.csv_path} ni {self.snapshot_path}")
+        return parse_csv(self.csv_path)
 
     def get_pokemon(self, name: str) -> Pokemon:
         name = name.lower()
         if name not in self.pokemon_db:
             raise ValueError(f"{name} no está en la base de datos")
         original = self.pokemon_db[name]
+        # Los ataques son inmutables y se comparten; solo los PS cambian durante un combate.
         return Pokemon(
             name=original.name,
             types=original.types.copy(),
             max_hp=original.max_hp,
             current_hp=original.max_hp,
-            attacks=[Attack(**a.__dict__) for a in original.attacks],
-            image=original.image,
-            card_image=original.card_image,
+            attacks=list(original.attacks),
+            image_name=original.image_name,
+            card_image_name=original.card_image_name,
             sprite_pos=original.sprite_pos
         )
 
@@ -137,11 +180,85 @@ def get_pokemon(name: str) -> Pokemon:
 def get_all_pokemon_names() -> List[str]:
     return pokemon_loader.get_all_pokemon_names()
 
-def calculate_damage(attacker: Pokemon, defender: Pokemon, attack: Attack) -> int:
+def type_ids(types: List[str]) -> Tuple[int, ...]:
+    """Ids enteros de los tipos de la tabla; los de NEUTRAL_TYPES no tienen id y no cambian el daño."""
+    return tuple(TYPE_IDS[t] for t in types if t in TYPE_IDS)
+
+@lru_cache(maxsize=1024)
+def _damage(attack_type: str, power: int, defender_types: Tuple[str, ...]) -> int:
     effectiveness = 1.0
-    for defender_type in defender.types:
-        effectiveness *= EFFECTIVITY_TABLE.get(attack.type, {}).get(defender_type, 1.0)
-    return int(attack.power * effectiveness)
+    row = TYPE_IDS.get(attack_type)
+    if row is not None:
+        base = row * NUM_TYPES
+        for col in type_ids(defender_types):
+            effectiveness *= EFFECTIVITY_MATRIX[base + col]
+    return int(power * effectiveness)
+
+def calculate_damage(attacker: Pokemon, defender: Pokemon, attack: Attack) -> int:
+    # El daño solo depende del ataque y de los tipos del defensor, así que se cachea.
+    return _damage(attack.type, attack.power, tuple(defender.types))
+
+def damage_table(attacker: Pokemon, defender: Pokemon) -> Tuple[int, ...]:
+    """Daño de cada ataque de `attacker` contra `defender`, en el orden de `attacks`."""
+    defender_types = tuple(defender.types)
+    return tuple(_damage(atk.type, atk.power, defender_types) for atk in attacker.attacks)
 
 def is_fainted(pokemon: Pokemon) -> bool:
     return pokemon.current_hp <= 0
+
+class Hit(NamedTuple):
+    damage: int
+    critical: bool
+
+@dataclass(frozen=True)
+class Ruleset:
+    """Reglas aleatorias opcionales: precisión, variación de daño y golpes críticos.
+
+    Sin un Ruleset el daño es el de `calculate_damage`, siempre igual. Con uno,
+    cada golpe puede fallar según `Attack.accuracy`, el daño se multiplica por
+    un porcentaje entero uniforme entre `min_roll` y 100 y con probabilidad
+    `crit_chance` se multiplica además por `crit_multiplier`.
+    """
+    min_roll: int = 85
+    crit_chance: float = 1 / 16
+    crit_multiplier: float = 1.5
+    use_accuracy: bool = True
+    # Resultados de daño por ataque (sin contar fallo ni crítico) que considera la búsqueda.
+    damage_buckets: int = 3
+
+    def _hit_chance(self, accuracy: int) -> float:
+        return min(accuracy, 100) / 100 if self.use_accuracy else 1.0
+
+    def roll(self, base_damage: int, accuracy: int, rng: random.Random) -> Optional[Hit]:
+        """Resultado de un golpe real; None si falla."""
+        if rng.random() >= self._hit_chance(accuracy):
+            return None
+        critical = rng.random() < self.crit_chance
+        multiplier = self.crit_multiplier if critical else 1.0
+        return Hit(int(base_damage * multiplier * rng.randint(self.min_roll, 100) / 100), critical)
+
+    def outcomes(self, base_damage: int, accuracy: int) -> Tuple[Tuple[float, int], ...]:
+        """Distribución (probabilidad, daño) de un ataque, agrupada para la búsqueda.
+
+        Los porcentajes de daño se reparten en `damage_buckets` grupos consecutivos
+        representados por su daño medio; los resultados con el mismo
+        daño se suman. Ordenados de mayor a menor probabilidad.
+        """
+        return _outcomes(self, base_damage, accuracy)
+
+@lru_cache(maxsize=1024)
+def _outcomes(rules: Ruleset, base_damage: int, accuracy: int) -> Tuple[Tuple[float, int], ...]:
+    hit = rules._hit_chance(accuracy)
+    rolls = list(range(rules.min_roll, 101))
+    buckets = max(1, min(rules.damage_buckets, len(rolls)))
+    merged: Dict[int, float] = {}
+    if hit < 1.0:
+        merged[0] = 1.0 - hit
+    for multiplier, chance in ((1.0, 1.0 - rules.crit_chance), (rules.crit_multiplier, rules.crit_chance)):
+        if chance <= 0:
+            continue
+        for b in range(buckets):
+            group = rolls[b * len(rolls) // buckets:(b + 1) * len(rolls) // buckets]
+            damage = round(sum(int(base_damage * multiplier * r / 100) for r in group) / len(group))
+            merged[damage] = merged.get(damage, 0.0) + hit * chance * len(group) / len(rolls)
+    return tuple(sorted(((p, d) for d, p in merged.items()), key=lambda o: (-o[0], -o[1])))
@@ -0,0 +1,178 @@
+# policy.py
+"""Tablas de política precalculadas para todos los enfrentamientos del roster.
+
+`python -m game.policy build` resuelve cada par ordenado de especies con
+game.endgame y guarda el mejor ataque de cada estado en un único archivo
+binario. En tiempo de ejecución el archivo se mapea en memoria y cada consulta
+lee un solo byte, sin recalcular nada al arrancar.
+
+Formato (little-endian):
+    cabecera   MAGIC, versión, largo de nombre, sha256 del contenido, nº de especies
+    especies   nombre (NAME_SIZE bytes, relleno con ceros), PS máximos (u16)
+    índice     offset (u64) del bloque de cada par (ia, jugador), en orden fila por fila
+    bloques    int8[2][ai_hp + 1][player_hp + 1] con el mejor ataque (turno IA, turno jugador)
+
+El hash cubre el CSV (o, sin él, el snapshot compilado a partir de ese CSV) y
+EFFECTIVITY_TABLE: si cualquiera cambia, el archivo se considera obsoleto y se
+ignora hasta reconstruirlo.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from .pokemon import EFFECTIVITY_TABLE, PokemonDataError, pokemon_loader
+from .snapshot import SnapshotRoster, csv_hash
+
+MAGIC = b"PKPOLICY"
+FORMAT_VERSION = 1
+NAME_SIZE = 32
+DEFAULT_PATH = pokemon_loader.data_dir / "policy.bin"
+
+_HEADER = struct.Struct("<8sHH32sI")
+_SPECIES = struct.Struct(f"<{NAME_SIZE}sH")
+_OFFSET = struct.Struct("<Q")
+
+def content_hash(csv_path: Path = pokemon_loader.csv_path) -> bytes:
+    """sha256 del roster y de la tabla de efectividad.
+
+    El roster entra por el sha256 del CSV, el mismo que guarda el snapshot: si
+    solo está el snapshot (ver game.snapshot) se usa el suyo y el libro sigue
+    siendo válido.
+    """
+    digest = hashlib.sha256()
+    if csv_path.exists():
+        digest.update(csv_hash(csv_path))
+    else:
+        roster = pokemon_loader.pokemon_db
+        if not isinstance(roster, SnapshotRoster):
+            raise PokemonDataError(f"No se encontró {csv_path} y el roster no viene de un snapshot")
+        digest.update(roster.csv_hash)
+    chart = sorted((atk, sorted(row.items())) for atk, row in EFFECTIVITY_TABLE.items())
+    digest.update(repr(chart).encode("utf-8"))
+    return digest.digest()
+
+class PolicyView:
+    """Vista de un enfrentamiento dentro del archivo; se usa igual que una EndgameTable."""
+    __slots__ = ("_buffer", "_offset", "_rows", "_cols")
+
+    def __init__(self, buffer: mmap.mmap, offset: int, max_ai_hp: int, max_player_hp: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._rows = max_ai_hp + 1
+        self._cols = max_player_hp + 1
+
+    def best_move(self, ai_hp: int, player_hp: int, ai_to_move: bool = True) -> int:
+        if ai_hp <= 0 or player_hp <= 0:
+            return 0
+        side = 0 if ai_to_move else 1
+        return self._buffer[self._offset + (side * self._rows + ai_hp) * self._cols + player_hp]
+
+class PolicyBook:
+    def __init__(self, buffer: mmap.mmap, species: Dict[str, Tuple[int, int]], offsets_at: int):
+        self._buffer = buffer
+        # nombre -> (posición en el roster, PS máximos)
+        self._species = species
+        self._offsets_at = offsets_at
+
+    @classmethod
+    def open(cls, path: Path = DEFAULT_PATH, expected_hash: Optional[bytes] = None) -> Optional["PolicyBook"]:
+        """Mapea el archivo; devuelve None si no existe, es de otra versión o está obsoleto."""
+        if not path.exists():
+            return None
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < _HEADER.size:
+            buffer.close()
+            return None
+        magic, version, name_size, digest, count = _HEADER.unpack_from(buffer, 0)
+        expected_hash = content_hash() if expected_hash is None else expected_hash
+        if magic != MAGIC or version != FORMAT_VERSION or name_size != NAME_SIZE or digest != expected_hash:
+            buffer.close()
+            return None
+        species = {}
+        for i in range(count):
+            raw_name, max_hp = _SPECIES.unpack_from(buffer, _HEADER.size + i * _SPECIES.size)
+            species[raw_name.rstrip(b"\0").decode("utf-8")] = (i, max_hp)
+        hps = [max_hp + 1 for _, max_hp in species.values()]
+        offsets_at = _HEADER.size + count * _SPECIES.size
+        if len(buffer) != offsets_at + count * count * _OFFSET.size + 2 * sum(hps) ** 2:
+            buffer.close()
+            return None
+        return cls(buffer, species, offsets_at)
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._species
+
+    def view(self, ai_name: str, player_name: str) -> Optional[PolicyView]:
+        ai = self._species.get(ai_name.lower())
+        player = self._species.get(player_name.lower())
+        if ai is None or player is None:
+            return None
+        pair = ai[0] * len(self._species) + player[0]
+        (offset,) = _OFFSET.unpack_from(self._buffer, self._offsets_at + pair * _OFFSET.size)
+        return PolicyView(self._buffer, offset, ai[1], player[1])
+
+_book: Optional[PolicyBook] = None
+_book_loaded = False
+
+def load_policy_book() -> Optional[PolicyBook]:
+    """Libro por defecto de data/, abierto una sola vez por proceso."""
+    global _book, _book_loaded
+    if not _book_loaded:
+        _book = PolicyBook.open()
+        _book_loaded = True
+    return _book
+
+def build(path: Path = DEFAULT_PATH) -> int:
+    from .endgame import solve_pokemon  # NumPy solo se necesita para construir
+
+    roster = list(pokemon_loader.pokemon_db.items())
+    names = [name.encode("utf-8") for name, _ in roster]
+    if any(len(name) > NAME_SIZE for name in names):
+        raise ValueError(f"Los nombres deben ocupar como máximo {NAME_SIZE} bytes")
+
+    count = len(roster)
+    data_start = _HEADER.size + count * _SPECIES.size + count * count * _OFFSET.size
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, NAME_SIZE, content_hash(), count))
+        for name, (_, pokemon) in zip(names, roster):
+            file.write(_SPECIES.pack(name, pokemon.max_hp))
+        offset = data_start
+        for _, ai in roster:
+            for _, player in roster:
+                file.write(_OFFSET.pack(offset))
+                offset += 2 * (ai.max_hp + 1) * (player.max_hp + 1)
+        for _, ai in roster:
+            for _, player in roster:
+                file.write(solve_pokemon(ai, player).best_moves.tobytes())
+        size = file.tell()
+    os.replace(tmp_path, path)
+    return size
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tablas de política precalculadas para el roster")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="resuelve todos los pares de especies y escribe el archivo")
+    build_cmd.add_argument("--output", type=Path, default=DEFAULT_PATH)
+    check_cmd = sub.add_parser("check", help="indica si el archivo existe y está al día")
+    check_cmd.add_argument("--path", type=Path, default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        size = build(args.output)
+        print(f"Tabla escrita en {args.output} ({size / 1e6:.1f} MB)")
+    else:
+        book = PolicyBook.open(args.path)
+        if book is None:
+            raise SystemExit(f"{args.path} no existe o está obsoleto; ejecuta `python -m game.policy build`")
+        print(f"{args.path} está al día")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# search_stats.py
+import time
+from typing import Dict, List, Optional
+from .transposition import TranspositionTable
+
+class SearchStats:
+    """Costo de una decisión: nodos por ply, cortes beta, aciertos de la tabla y tiempo.
+
+    Es opcional: la búsqueda solo lo actualiza si se le pasa uno, así que sin
+    estadísticas el único costo es comparar con None en cada nodo.
+    """
+
+    def __init__(self):
+        self.nodes_by_ply: List[int] = []
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.depth = 0
+        self.best_move: Optional[int] = None
+        self.score: Optional[int] = None
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.elapsed_ms = 0.0
+        self._start = 0.0
+        self._tt: Optional[TranspositionTable] = None
+
+    def visit(self, ply: int) -> None:
+        nodes = self.nodes_by_ply
+        while len(nodes) <= ply:
+            nodes.append(0)
+        nodes[ply] += 1
+
+    def cutoff(self, first_move: bool) -> None:
+        self.cutoffs += 1
+        if first_move:
+            self.first_move_cutoffs += 1
+
+    def start(self, tt: Optional[TranspositionTable]) -> None:
+        self._tt = tt
+        if tt is not None:
+            self.tt_hits, self.tt_misses = -tt.hits, -tt.misses
+        self._start = time.perf_counter()
+
+    def finish(self, best_move: int, score: int, depth: int) -> None:
+        self.elapsed_ms = (time.perf_counter() - self._start) * 1000
+        self.best_move, self.score, self.depth = best_move, score, depth
+        if self._tt is not None:
+            self.tt_hits += self._tt.hits
+            self.tt_misses += self._tt.misses
+            self._tt = None
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_by_ply)
+
+    @property
+    def first_move_cutoff_ratio(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """b tal que b^profundidad = nodos visitados."""
+        if self.depth <= 0 or self.nodes <= 1:
+            return 0.0
+        return self.nodes ** (1 / self.depth)
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / (self.elapsed_ms / 1000) if self.elapsed_ms > 0 else 0.0
+
+    def as_record(self) -> Dict:
+        return {
+            "best_move": self.best_move,
+            "score": self.score,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "nodes_by_ply": list(self.nodes_by_ply),
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_ratio": self.first_move_cutoff_ratio,
+            "effective_branching_factor": self.effective_branching_factor,
+            "tt_hits": self.tt_hits,
+            "tt_misses": self.tt_misses,
+            "elapsed_ms": self.elapsed_ms,
+            "nodes_per_second": self.nodes_per_second,
+        }
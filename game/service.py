@@ -0,0 +1,462 @@
+# service.py
+"""Servicio local de decisiones de la IA, sin Pygame.
+
+Un servidor asyncio que habla HTTP/1.1 mínimo sobre TCP (solo 127.0.0.1 por
+defecto) o sobre un socket Unix:
+
+    python -m game.service serve --port 8765 --workers 4
+    python -m game.service serve --unix /tmp/pokeminmax.sock
+    python -m game.service query --port 8765 --ai pikachu --player charmander --ai-hp 40 --player-hp 90
+    python -m game.service bench --port 8765 --requests 2000 --concurrency 32
+
+Rutas:
+    POST /decision  {"ai", "player", "ai_hp", "player_hp", "ai_to_move"?, "depth"?, "time_budget_ms"?, "engine"?}
+                    (sin "depth" se busca a MAX_DEPTH; con "time_budget_ms", hasta agotarlo)
+                    -> {"move", "attack", "score", "depth", "engine"} para el bando que mueve, con el puntaje
+                    desde su punto de vista
+    GET  /stats     solicitudes, coalescidas, errores, en curso, profundidad de cola y latencia p50/p99
+    GET  /health
+
+Las búsquedas corren en un ProcessPoolExecutor que se calienta al arrancar.
+Cada proceso carga el roster una vez y guarda un SearchContext (con su tabla
+de transposición) por enfrentamiento, así que las consultas repetidas de un
+mismo combate reutilizan lo buscado. Con "engine": "endgame" se responde con
+la tabla exacta: el libro precalculado de game.policy está mapeado en memoria
+y lo comparten todos los procesos. Las solicitudes idénticas que llegan
+mientras otra igual está en curso esperan ese mismo resultado en lugar de
+buscar de nuevo.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import statistics
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+from .minimax import (MAX_DEPTH, MAX_ITERATIVE_DEPTH, Matchup, SearchContext, iterative_deepening,
+                      root_search)
+from .pokemon import get_pokemon, pokemon_loader
+from .transposition import TranspositionTable
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_TIME_BUDGET_MS = 10_000
+MAX_BODY_BYTES = 64 * 1024
+LATENCY_WINDOW = 10_000  # últimas solicitudes que cuentan para p50/p99
+# Enfrentamientos con contexto guardado por proceso, cada uno con una tabla chica: una entrada
+# ocupa unos 300 bytes, así que el total por proceso queda en ~160 MB (32 × 16 384 entradas).
+WORKER_CONTEXTS = 32
+CONTEXT_TT_ENTRIES = 16_384
+ENGINES = ("minimax", "endgame")
+
+class DecisionRequest(NamedTuple):
+    ai: str
+    player: str
+    ai_hp: int
+    player_hp: int
+    ai_to_move: bool
+    depth: int
+    time_budget_ms: Optional[float]
+    engine: str
+
+class RequestError(ValueError):
+    pass
+
+def parse_request(data: Dict) -> DecisionRequest:
+    """Valida el JSON de /decision; los nombres se normalizan para que solicitudes iguales coincidan."""
+    if not isinstance(data, dict):
+        raise RequestError("Se esperaba un objeto JSON")
+    try:
+        ai, player = str(data["ai"]).lower(), str(data["player"]).lower()
+        ai_hp, player_hp = data["ai_hp"], data["player_hp"]
+    except KeyError as e:
+        raise RequestError(f"Falta el campo {e.args[0]}") from None
+    for name in (ai, player):
+        if name not in pokemon_loader.pokemon_db:
+            raise RequestError(f"{name} no está en la base de datos")
+    for field, name, hp in (("ai_hp", ai, ai_hp), ("player_hp", player, player_hp)):
+        if not isinstance(hp, int) or isinstance(hp, bool) or hp <= 0:
+            raise RequestError(f"{field} debe ser un entero positivo (un estado terminal no tiene jugada)")
+        max_hp = pokemon_loader.pokemon_db[name].max_hp
+        if hp > max_hp:
+            raise RequestError(f"{field} supera los PS máximos de {name} ({max_hp})")
+    ai_to_move = data.get("ai_to_move", True)
+    budget = data.get("time_budget_ms")
+    # Con presupuesto la profundidad solo es un tope: si no se indica, decide el tiempo.
+    depth = data.get("depth")
+    if depth is None:
+        depth = MAX_DEPTH if budget is None else MAX_ITERATIVE_DEPTH
+    engine = data.get("engine", "minimax")
+    if not isinstance(ai_to_move, bool):
+        raise RequestError("ai_to_move debe ser true o false")
+    # bool es subclase de int: true no es una profundidad ni un presupuesto.
+    if not isinstance(depth, int) or isinstance(depth, bool) or not 1 <= depth <= MAX_ITERATIVE_DEPTH:
+        raise RequestError(f"depth debe estar entre 1 y {MAX_ITERATIVE_DEPTH}")
+    if budget is not None and (not isinstance(budget, (int, float)) or isinstance(budget, bool)
+                               or not 0 < budget <= MAX_TIME_BUDGET_MS):
+        raise RequestError(f"time_budget_ms debe estar entre 0 y {MAX_TIME_BUDGET_MS}")
+    if engine not in ENGINES:
+        raise RequestError(f"Motor desconocido: {engine} (disponibles: {', '.join(ENGINES)})")
+    return DecisionRequest(ai, player, ai_hp, player_hp, ai_to_move, depth,
+                           float(budget) if budget is not None else None, engine)
+
+# Estado de cada proceso del pool.
+_contexts: "OrderedDict[Tuple[str, str], Tuple[Matchup, SearchContext]]" = OrderedDict()
+_tables: Dict[Tuple[str, str], object] = {}
+
+def _warm_worker() -> int:
+    from .policy import load_policy_book
+
+    pokemon_loader.pokemon_db  # carga el roster (o mapea el snapshot) una sola vez
+    load_policy_book()
+    return os.getpid()
+
+def _endgame_move(mover: str, other: str, mover_hp: int, other_hp: int) -> Tuple[int, Optional[int]]:
+    table = _tables.get((mover, other))
+    if table is None:
+        from .policy import load_policy_book
+
+        book = load_policy_book()
+        table = book.view(mover, other) if book is not None else None
+        if table is None:
+            from .endgame import solve_pokemon  # NumPy solo hace falta sin el libro
+
+            table = solve_pokemon(get_pokemon(mover), get_pokemon(other))
+        _tables[(mover, other)] = table
+    # El libro solo guarda la jugada; la tabla resuelta también tiene el valor.
+    score = table.value(mover_hp, other_hp) if hasattr(table, "value") else None
+    return table.best_move(mover_hp, other_hp), score
+
+def decide(request: DecisionRequest) -> Dict:
+    """Busca la jugada del bando que mueve; corre dentro de un proceso del pool."""
+    if request.ai_to_move:
+        mover, other, mover_hp, other_hp = request.ai, request.player, request.ai_hp, request.player_hp
+    else:
+        mover, other, mover_hp, other_hp = request.player, request.ai, request.player_hp, request.ai_hp
+    depth = request.depth
+    if request.engine == "endgame":
+        index, score = _endgame_move(mover, other, mover_hp, other_hp)
+        depth = None
+    else:
+        key = (mover, other)
+        entry = _contexts.get(key)
+        if entry is None:
+            context = SearchContext(TranspositionTable(max_entries=CONTEXT_TT_ENTRIES))
+            entry = _contexts[key] = (Matchup(get_pokemon(mover), get_pokemon(other)), context)
+            if len(_contexts) > WORKER_CONTEXTS:
+                _contexts.popitem(last=False)
+        else:
+            _contexts.move_to_end(key)
+        matchup, context = entry
+        if request.time_budget_ms is not None:
+            index, score, depth = iterative_deepening(matchup, mover_hp, other_hp, request.time_budget_ms,
+                                                      max_depth=request.depth, context=context)
+        else:
+            index, score = root_search(matchup, mover_hp, other_hp, request.depth, context=context)
+    return {
+        "move": index,
+        "attack": pokemon_loader.pokemon_db[mover].attacks[index].name,
+        "score": score,
+        "depth": depth,
+        "engine": request.engine,
+    }
+
+def _content_length(headers: Dict[str, str]) -> int:
+    value = headers.get("content-length", "") or "0"
+    if not (value.isascii() and value.isdigit()):
+        raise RequestError(f"Content-Length inválido: {value!r}")
+    return int(value)
+
+class ServiceStats:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.requests = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.in_flight = 0  # búsquedas enviadas al pool y no terminadas
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+
+    def as_dict(self) -> Dict:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            # Las búsquedas que esperan un proceso libre.
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "workers": self.workers,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "mean_ms": statistics.fmean(latencies) if latencies else None,
+            "uptime_s": time.time() - self.started,
+        }
+
+class DecisionService:
+    def __init__(self, workers: int = os.cpu_count() or 1):
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.stats = ServiceStats(workers)
+        self._pending: Dict[DecisionRequest, "asyncio.Future[Dict]"] = {}
+
+    async def start(self) -> None:
+        """Arranca los procesos antes de aceptar conexiones, para que la primera solicitud no pague el arranque."""
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_worker) for _ in range(self.workers)))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def decide(self, request: DecisionRequest) -> Dict:
+        pending = self._pending.get(request)
+        if pending is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(pending)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, decide, request)
+        self._pending[request] = future
+        self.stats.in_flight += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self.stats.in_flight -= 1
+            del self._pending[request]
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if method == "GET" and path == "/stats":
+            return 200, self.stats.as_dict()
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if path != "/decision":
+            return 404, {"error": f"Ruta desconocida: {path}"}
+        if method != "POST":
+            return 405, {"error": "Usa POST en /decision"}
+        start = time.perf_counter()
+        self.stats.requests += 1
+        try:
+            request = parse_request(json.loads(body or b"null"))
+        except (RequestError, ValueError) as e:
+            self.stats.errors += 1
+            return 400, {"error": str(e)}
+        result = await self.decide(request)
+        self.stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+        return 200, result
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende solicitudes HTTP/1.1 sobre la conexión hasta que el cliente la cierre."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Línea de solicitud inválida"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = _content_length(headers)
+                except RequestError as e:
+                    # Sin un largo válido no se sabe dónde termina el cuerpo: se cierra la conexión.
+                    self.stats.errors += 1
+                    await self._respond(writer, 400, {"error": str(e)}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    self.stats.errors += 1
+                    await self._respond(writer, 413, {"error": f"El cuerpo supera los {MAX_BODY_BYTES} bytes"},
+                                        False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                try:
+                    status, payload = await self.handle(method.upper(), path.split("?", 1)[0], body)
+                except Exception as e:  # un error de búsqueda no debe tumbar el servidor
+                    self.stats.errors += 1
+                    status, payload = 500, {"error": repr(e)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        reason = http.client.responses.get(status, "")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                     f"\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+async def serve(service: DecisionService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix_path: Optional[str] = None, ready: Optional[asyncio.Event] = None) -> None:
+    await service.start()
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.serve_connection, path=unix_path)
+    else:
+        server = await asyncio.start_server(service.serve_connection, host, port)
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if unix_path is not None and os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+class ServiceClient:
+    """Cliente síncrono con una conexión persistente; no es seguro compartirlo entre hilos."""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_path: Optional[str] = None,
+                 timeout: float = 30.0):
+        if unix_path is not None:
+            self._connection = _UnixHTTPConnection(unix_path, timeout)
+        else:
+            self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self._connection.request(method, path, body, headers)
+        response = self._connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RequestError(f"{response.status}: {data.get('error')}")
+        return data
+
+    def decide(self, ai: str, player: str, ai_hp: int, player_hp: int, ai_to_move: bool = True,
+               depth: Optional[int] = None, time_budget_ms: Optional[float] = None,
+               engine: str = "minimax") -> Dict:
+        """Sin `depth` el servicio busca a MAX_DEPTH, o hasta agotar `time_budget_ms` si se indica."""
+        payload = {"ai": ai, "player": player, "ai_hp": ai_hp, "player_hp": player_hp,
+                   "ai_to_move": ai_to_move, "engine": engine}
+        if depth is not None:
+            payload["depth"] = depth
+        if time_budget_ms is not None:
+            payload["time_budget_ms"] = time_budget_ms
+        return self._request("POST", "/decision", payload)
+
+    def stats(self) -> Dict:
+        return self._request("GET", "/stats")
+
+    def close(self) -> None:
+        self._connection.close()
+
+def _bench(args) -> Dict:
+    """`concurrency` clientes en hilos con estados al azar; mide la latencia vista desde el cliente."""
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    from .pokemon import get_all_pokemon_names
+
+    names = get_all_pokemon_names()
+    rng = random.Random(args.seed)
+    states = []
+    for _ in range(args.requests):
+        ai, player = rng.sample(names, 2)
+        states.append((ai, player, rng.randint(1, get_pokemon(ai).max_hp),
+                       rng.randint(1, get_pokemon(player).max_hp), rng.random() < 0.5))
+
+    def worker(chunk):
+        client = ServiceClient(args.host, args.port, args.unix)
+        latencies = []
+        for ai, player, ai_hp, player_hp, ai_to_move in chunk:
+            begin = time.perf_counter()
+            client.decide(ai, player, ai_hp, player_hp, ai_to_move, args.depth, args.time_budget_ms)
+            latencies.append((time.perf_counter() - begin) * 1000)
+        client.close()
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as threads:
+        chunks = [states[i::args.concurrency] for i in range(args.concurrency)]
+        latencies = sorted(ms for result in threads.map(worker, chunks) for ms in result)
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "client_p50_ms": latencies[len(latencies) // 2],
+        "client_p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+        "server": ServiceClient(args.host, args.port, args.unix).stats(),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servicio local de decisiones de la IA")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "query", "stats", "bench"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--host", default=DEFAULT_HOST)
+        cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+        cmd.add_argument("--unix", help="ruta de un socket Unix en lugar de TCP")
+        if name == "serve":
+            cmd.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        if name in ("query", "bench"):
+            cmd.add_argument("--depth", type=int, help=f"por defecto {MAX_DEPTH}, o sin tope con --time-budget-ms")
+            cmd.add_argument("--time-budget-ms", type=float)
+        if name == "query":
+            cmd.add_argument("--ai", required=True)
+            cmd.add_argument("--player", required=True)
+            cmd.add_argument("--ai-hp", type=int, required=True)
+            cmd.add_argument("--player-hp", type=int, required=True)
+            cmd.add_argument("--player-to-move", action="store_true")
+            cmd.add_argument("--engine", choices=ENGINES, default="minimax")
+        if name == "bench":
+            cmd.add_argument("--requests", type=int, default=1000)
+            cmd.add_argument("--concurrency", type=int, default=16)
+            cmd.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"Sirviendo en {where} con {args.workers} procesos")
+        try:
+            asyncio.run(serve(DecisionService(args.workers), args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.command == "bench":
+        print(json.dumps(_bench(args), indent=2))
+        return
+    client = ServiceClient(args.host, args.port, args.unix)
+    if args.command == "stats":
+        print(json.dumps(client.stats(), indent=2))
+    else:
+        print(json.dumps(client.decide(args.ai, args.player, args.ai_hp, args.player_hp, not args.player_to_move,
+                                       args.depth, args.time_budget_ms, args.engine), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# simulate.py
+"""Simulador de combates sin interfaz gráfica.
+
+Juega combates completos con BattleSystem para todos los pares de especies y
+los reparte entre procesos. Cada combate se escribe como una línea JSON y al
+final se imprime un resumen agregado.
+
+    python -m game.simulate --games 10 --opponent random --jobs 4 --output resultados.jsonl
+    python -m game.simulate --engine mcts --iterations 5000 --stochastic
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+from .battle import BattleSystem
+from .engines import ENGINES, Engine, ExpectiminimaxEngine, MCTSEngine, MinimaxEngine, create_engine
+from .mcts import DEFAULT_ITERATIONS
+from .minimax import CHANCE_DEPTH, MAX_DEPTH, SearchContext, minimax_decision
+from .pokemon import Ruleset, get_all_pokemon_names
+
+OPPONENTS = ("minimax", "greedy", "random")
+DEFAULT_MAX_TURNS = 200
+
+class GameSpec(NamedTuple):
+    ai: str
+    player: str
+    opponent: str
+    depth: int
+    seed: int
+    max_turns: int
+    collect_stats: bool = False
+    engine: Optional[str] = None  # motor de la IA; None: el de BattleSystem según las reglas
+    iterations: int = DEFAULT_ITERATIONS
+    stochastic: bool = False
+
+def _player_move(battle: BattleSystem, spec: GameSpec, rng: random.Random, context: SearchContext) -> int:
+    if spec.opponent == "minimax":
+        # Mismo algoritmo que la IA, con los papeles invertidos.
+        return minimax_decision(battle.player_pokemon, battle.ai_pokemon, spec.depth, context=context)
+    if spec.opponent == "greedy":
+        return max(range(len(battle.player_damage)), key=battle.player_damage.__getitem__)
+    return rng.randrange(len(battle.player_pokemon.attacks))
+
+def engine_name(spec: GameSpec) -> str:
+    return spec.engine or ("expectiminimax" if spec.stochastic else "minimax")
+
+def _ai_engine(spec: GameSpec, on_stats) -> Engine:
+    name = engine_name(spec)
+    if name == MinimaxEngine.name:
+        return MinimaxEngine(spec.depth, on_stats=on_stats)
+    if name == ExpectiminimaxEngine.name:
+        return ExpectiminimaxEngine(depth=spec.depth, on_stats=on_stats)
+    if name == MCTSEngine.name:
+        return MCTSEngine(spec.iterations, seed=spec.seed)
+    return create_engine(name)
+
+def play_game(spec: GameSpec) -> Dict:
+    """Juega un combate completo; si nadie gana en `max_turns` jugadas se declara empate."""
+    start = time.perf_counter()
+    search_log: List[Dict] = []
+    turns = 0
+
+    def log_stats(record: Dict) -> None:
+        search_log.append(dict(record, turn=turns, ai_hp=battle.ai_pokemon.current_hp,
+                               player_hp=battle.player_pokemon.current_hp))
+
+    engine = _ai_engine(spec, log_stats if spec.collect_stats else None)
+    battle = BattleSystem(spec.player, spec.ai, Ruleset() if spec.stochastic else None, spec.seed, engine)
+    rng = random.Random(spec.seed)
+    player_context = SearchContext()
+    while not battle.state.game_over and turns < spec.max_turns:
+        if battle.state.current_turn == 'player':
+            index = _player_move(battle, spec, rng, player_context)
+        else:
+            index = engine.choose(battle.ai_pokemon, battle.player_pokemon)
+        battle.execute_move(index)
+        player_context.record_move(index)
+        turns += 1
+    engine.close()
+    result = {
+        "ai": battle.ai_pokemon.name,
+        "player": battle.player_pokemon.name,
+        "engine": engine.name,
+        "opponent": spec.opponent,
+        "depth": spec.depth,
+        "seed": spec.seed,
+        "winner": battle.state.winner or "draw",
+        "turns": turns,
+        "ai_hp": battle.ai_pokemon.current_hp,
+        "player_hp": battle.player_pokemon.current_hp,
+        "ms": (time.perf_counter() - start) * 1000,
+    }
+    if spec.collect_stats:
+        result["search"] = search_log
+    return result
+
+def game_specs(games: int, opponent: str, depth: int, seed: int = 0, max_turns: int = DEFAULT_MAX_TURNS,
+               names: Optional[List[str]] = None, collect_stats: bool = False, engine: Optional[str] = None,
+               iterations: int = DEFAULT_ITERATIONS, stochastic: bool = False) -> Iterator[GameSpec]:
+    """`games` combates por cada par ordenado (IA, jugador) de especies distintas."""
+    names = names or get_all_pokemon_names()
+    pairs = [(ai, player) for ai, player in itertools.product(names, repeat=2) if ai != player]
+    for n in range(games):
+        for i, (ai, player) in enumerate(pairs):
+            yield GameSpec(ai, player, opponent, depth, seed + n * len(pairs) + i, max_turns, collect_stats,
+                           engine, iterations, stochastic)
+
+def run(specs: Iterable[GameSpec], jobs: int = 1) -> Iterator[Dict]:
+    if jobs <= 1:
+        yield from map(play_game, specs)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(play_game, specs, chunksize=16)
+
+class Summary:
+    def __init__(self):
+        self.games = 0
+        self.wins = {"ai": 0, "player": 0, "draw": 0}
+        self.turns = 0
+        self.start = time.perf_counter()
+
+    def add(self, result: Dict) -> None:
+        self.games += 1
+        self.wins[result["winner"]] += 1
+        self.turns += result["turns"]
+
+    def as_dict(self) -> Dict:
+        elapsed = time.perf_counter() - self.start
+        games = max(self.games, 1)
+        return {
+            "games": self.games,
+            "ai_win_rate": self.wins["ai"] / games,
+            "player_win_rate": self.wins["player"] / games,
+            "draw_rate": self.wins["draw"] / games,
+            "turns_per_game": self.turns / games,
+            "games_per_second": self.games / elapsed if elapsed > 0 else 0.0,
+            "seconds": elapsed,
+        }
+
+def simulate(specs: Iterable[GameSpec], jobs: int, out: TextIO, stats_out: Optional[TextIO] = None) -> Dict:
+    summary = Summary()
+    for result in run(specs, jobs):
+        # Las estadísticas de búsqueda van a su propio archivo, una línea por turno de la IA.
+        for record in result.pop("search", ()):
+            if stats_out is not None:
+                stats_out.write(json.dumps(dict(record, ai=result["ai"], player=result["player"],
+                                                seed=result["seed"])) + "\n")
+        out.write(json.dumps(result) + "\n")
+        summary.add(result)
+    return summary.as_dict()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Combates IA contra IA o contra una línea base, sin interfaz")
+    parser.add_argument("--games", type=int, default=1, help="combates por cada par de especies")
+    parser.add_argument("--opponent", choices=OPPONENTS, default="minimax", help="quién controla al jugador")
+    parser.add_argument("--engine", choices=sorted(ENGINES), help="motor de la IA (por defecto minimax, "
+                        "o expectiminimax con --stochastic)")
+    parser.add_argument("--depth", type=int, help=f"profundidad de minimax ({MAX_DEPTH}) o expectiminimax "
+                        f"({CHANCE_DEPTH})")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="iteraciones por jugada de mcts")
+    parser.add_argument("--stochastic", action="store_true", help="precisión, variación de daño y críticos")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="procesos en paralelo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--output", help="archivo JSONL (por defecto, salida estándar)")
+    parser.add_argument("--stats-log", help="archivo JSONL con las estadísticas de cada búsqueda de la IA")
+    args = parser.parse_args()
+    name = args.engine or ("expectiminimax" if args.stochastic else "minimax")
+    if name == ExpectiminimaxEngine.name and not args.stochastic:
+        parser.error("expectiminimax necesita --stochastic")
+    depth = args.depth if args.depth is not None else CHANCE_DEPTH if name == ExpectiminimaxEngine.name else MAX_DEPTH
+
+    specs = game_specs(args.games, args.opponent, depth, args.seed, args.max_turns,
+                       collect_stats=bool(args.stats_log), engine=args.engine, iterations=args.iterations,
+                       stochastic=args.stochastic)
+    with contextlib.ExitStack() as stack:
+        out = stack.enter_context(open(args.output, "w", encoding="utf-8")) if args.output else sys.stdout
+        stats_out = stack.enter_context(open(args.stats_log, "w", encoding="utf-8")) if args.stats_log else None
+        summary = simulate(specs, args.jobs, out, stats_out)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# snapshot.py
+"""Roster compilado en un archivo binario que se mapea en memoria al arrancar.
+
+`python -m game.snapshot build` lee data/pokemon.csv una sola vez y escribe
+data/pokemon.snapshot con tablas de tamaño fijo. Al arrancar, PokemonLoader
+mapea el archivo, valida la cabecera y los índices de todas las filas y solo
+construye el Pokémon de una especie la primera vez que se pide, así que el
+costo de arranque casi no depende del tamaño del roster.
+
+Formato (little-endian):
+    cabecera  MAGIC, versión, sha256 del CSV, nº de tipos, nº de especies, nº de ataques
+    tipos     nombre (TYPE_NAME_SIZE bytes); los primeros son POKEMON_TYPES en orden, así que
+              coinciden con TYPE_IDS, y después van los tipos que la tabla no conoce
+    especies  nombre, imagen, carta (relleno con ceros), tipo 1, tipo 2 (NO_TYPE si no tiene),
+              PS máximos, posición del sprite, primer ataque y cantidad de ataques
+    ataques   nombre, tipo, poder, precisión
+
+Un archivo mal formado o de otra versión es un error (SnapshotError), no se
+ignora en silencio. Si el CSV cambió después de compilarlo se avisa y se lee el
+CSV; si el CSV no está, el snapshot basta por sí solo.
+
+El atlas de sprites ya escalados lo arma la interfaz (`python -m ui.assets build`),
+porque este paquete no depende de Pygame.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from .pokemon import POKEMON_TYPES, Attack, Pokemon, PokemonDataError, parse_csv
+
+MAGIC = b"PKSNAPSH"
+FORMAT_VERSION = 1
+NAME_SIZE = 32
+FILE_NAME_SIZE = 64
+TYPE_NAME_SIZE = 16
+NO_TYPE = 0xFF
+
+_HEADER = struct.Struct("<8sH32sHII")
+_TYPE = struct.Struct(f"<{TYPE_NAME_SIZE}s")
+_SPECIES = struct.Struct(f"<{NAME_SIZE}s{FILE_NAME_SIZE}s{FILE_NAME_SIZE}sBBHhhIB")
+_ATTACK = struct.Struct(f"<{NAME_SIZE}sBHB")
+
+class SnapshotError(PokemonDataError):
+    pass
+
+def csv_hash(csv_path: Path) -> bytes:
+    return hashlib.sha256(csv_path.read_bytes()).digest()
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8")
+
+class SnapshotRoster(Mapping):
+    """nombre en minúsculas -> Pokémon con los PS al máximo, decodificado la primera vez que se pide.
+
+    Se usa como el diccionario `pokemon_db` que arma el CSV.
+    """
+
+    def __init__(self, buffer: mmap.mmap, types: List[str], species: List[tuple], attacks: List[tuple],
+                 csv_hash: bytes):
+        self._buffer = buffer
+        # Hash del CSV con el que se compiló.
+        self.csv_hash = csv_hash
+        self._types = types
+        self._species = species
+        self._attacks = attacks
+        self._index: Dict[str, int] = {_text(record[0]).lower(): i for i, record in enumerate(species)}
+        self._cache: Dict[int, Pokemon] = {}
+
+    def __getitem__(self, name: str) -> Pokemon:
+        i = self._index[name]
+        pokemon = self._cache.get(i)
+        if pokemon is None:
+            raw_name, image, card, type1, type2, max_hp, sprite_x, sprite_y, first, count = self._species[i]
+            types = [self._types[type1]] + ([self._types[type2]] if type2 != NO_TYPE else [])
+            attacks = [Attack(_text(name), self._types[type_id], power, accuracy)
+                       for name, type_id, power, accuracy in self._attacks[first:first + count]]
+            pokemon = self._cache[i] = Pokemon(
+                name=_text(raw_name),
+                types=types,
+                max_hp=max_hp,
+                current_hp=max_hp,
+                attacks=attacks,
+                image_name=_text(image) or None,
+                card_image_name=_text(card) or None,
+                sprite_pos=(sprite_x, sprite_y),
+            )
+        return pokemon
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        self._buffer.close()
+
+def load_snapshot(path: Path) -> SnapshotRoster:
+    """Mapea y valida el snapshot; cualquier inconsistencia levanta SnapshotError."""
+    with open(path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # archivo vacío
+            raise SnapshotError(f"{path} está vacío") from None
+    try:
+        return _parse(path, buffer)
+    except BaseException:
+        buffer.close()
+        raise
+
+def _parse(path: Path, buffer: mmap.mmap) -> SnapshotRoster:
+    if len(buffer) < _HEADER.size:
+        raise SnapshotError(f"{path} está truncado")
+    magic, version, digest, type_count, species_count, attack_count = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} no es un snapshot del roster")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"{path} tiene la versión {version} y se esperaba {FORMAT_VERSION}; "
+                            f"reconstrúyelo con `python -m game.snapshot build`")
+    expected = (_HEADER.size + type_count * _TYPE.size + species_count * _SPECIES.size
+                + attack_count * _ATTACK.size)
+    if len(buffer) != expected:
+        raise SnapshotError(f"{path} mide {len(buffer)} bytes y su cabecera indica {expected}")
+
+    offset = _HEADER.size
+    types = [_text(raw) for (raw,) in _TYPE.iter_unpack(buffer[offset:offset + type_count * _TYPE.size])]
+    if tuple(types[:len(POKEMON_TYPES)]) != POKEMON_TYPES:
+        raise SnapshotError(f"La tabla de tipos de {path} no coincide con POKEMON_TYPES")
+    offset += type_count * _TYPE.size
+    species = list(_SPECIES.iter_unpack(buffer[offset:offset + species_count * _SPECIES.size]))
+    offset += species_count * _SPECIES.size
+    attacks = list(_ATTACK.iter_unpack(buffer[offset:offset + attack_count * _ATTACK.size]))
+
+    for i, (name, type_id, _, accuracy) in enumerate(attacks):
+        if type_id >= type_count or accuracy > 100:
+            raise SnapshotError(f"{path}: el ataque {i} ({_text(name)}) tiene tipo o precisión inválidos")
+    for i, (name, _, _, type1, type2, max_hp, _, _, first, count) in enumerate(species):
+        if (type1 >= type_count or (type2 != NO_TYPE and type2 >= type_count) or max_hp == 0
+                or first + count > attack_count):
+            raise SnapshotError(f"{path}: la especie {i} ({_text(name)}) tiene tipos, PS o ataques inválidos")
+    roster = SnapshotRoster(buffer, types, species, attacks, digest)
+    if len(roster) != species_count:
+        raise SnapshotError(f"{path} tiene especies con nombre repetido")
+    return roster
+
+def open_snapshot(path: Path, csv_path: Path) -> Optional[SnapshotRoster]:
+    """El snapshot si existe y está al día con el CSV; None si hay que leer el CSV."""
+    if not path.exists():
+        return None
+    roster = load_snapshot(path)
+    if csv_path.exists() and roster.csv_hash != csv_hash(csv_path):
+        roster.close()
+        print(f"[WARNING] {path} es anterior a {csv_path.name}; se usa el CSV. "
+              f"Reconstrúyelo con `python -m game.snapshot build`")
+        return None
+    return roster
+
+def _encode(text: Optional[str], size: int, what: str) -> bytes:
+    raw = (text or "").encode("utf-8")
+    if len(raw) > size:
+        raise SnapshotError(f"{what} {text!r} ocupa más de {size} bytes")
+    return raw
+
+def build(csv_path: Path, path: Path) -> Tuple[int, int]:
+    """Compila el CSV en `path`; devuelve (especies, bytes escritos)."""
+    roster = list(parse_csv(csv_path).values())
+    types = list(POKEMON_TYPES)
+    for pokemon in roster:
+        for name in pokemon.types + [attack.type for attack in pokemon.attacks]:
+            if name not in types:
+                types.append(name)
+    if len(types) >= NO_TYPE:
+        raise SnapshotError(f"Demasiados tipos distintos ({len(types)})")
+    type_id = {name: i for i, name in enumerate(types)}
+
+    species_records = []
+    attack_records = []
+    for pokemon in roster:
+        if len(pokemon.types) > 2:
+            raise SnapshotError(f"{pokemon.name} tiene más de dos tipos")
+        species_records.append(_SPECIES.pack(
+            _encode(pokemon.name, NAME_SIZE, "El nombre"),
+            _encode(pokemon.image_name, FILE_NAME_SIZE, "La imagen"),
+            _encode(pokemon.card_image_name, FILE_NAME_SIZE, "La carta"),
+            type_id[pokemon.types[0]],
+            type_id[pokemon.types[1]] if len(pokemon.types) > 1 else NO_TYPE,
+            pokemon.max_hp, pokemon.sprite_pos[0], pokemon.sprite_pos[1],
+            len(attack_records), len(pokemon.attacks),
+        ))
+        for attack in pokemon.attacks:
+            attack_records.append(_ATTACK.pack(_encode(attack.name, NAME_SIZE, "El ataque"),
+                                               type_id[attack.type], attack.power, attack.accuracy))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, csv_hash(csv_path), len(types),
+                                len(species_records), len(attack_records)))
+        for name in types:
+            file.write(_TYPE.pack(_encode(name, TYPE_NAME_SIZE, "El tipo")))
+        file.writelines(species_records)
+        file.writelines(attack_records)
+        size = file.tell()
+    os.replace(tmp_path, path)
+    return len(species_records), size
+
+def main() -> None:
+    from .pokemon import pokemon_loader
+
+    parser = argparse.ArgumentParser(description="Roster compilado para un arranque sin leer el CSV")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="compila el CSV en el snapshot")
+    build_cmd.add_argument("--csv", type=Path, default=pokemon_loader.csv_path)
+    build_cmd.add_argument("--output", type=Path, default=pokemon_loader.snapshot_path)
+    check_cmd = sub.add_parser("check", help="valida el snapshot y comprueba que esté al día con el CSV")
+    check_cmd.add_argument("--path", type=Path, default=pokemon_loader.snapshot_path)
+    check_cmd.add_argument("--csv", type=Path, default=pokemon_loader.csv_path)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count, size = build(args.csv, args.output)
+        print(f"Snapshot escrito en {args.output} ({count} especies, {size / 1e3:.1f} kB)")
+    else:
+        if not args.path.exists():
+            raise SystemExit(f"{args.path} no existe; ejecuta `python -m game.snapshot build`")
+        roster = load_snapshot(args.path)
+        if args.csv.exists() and roster.csv_hash != csv_hash(args.csv):
+            raise SystemExit(f"{args.path} es anterior a {args.csv}; ejecuta `python -m game.snapshot build`")
+        print(f"{args.path} es válido y está al día ({len(roster)} especies)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# team.py
+"""Combates por equipos de hasta seis Pokémon, con cambios.
+
+En su turno cada bando ataca con su Pokémon activo o cambia a otro que siga en
+pie; cambiar ocupa el turno. Cuando el activo se debilita entra
+automáticamente el primero vivo del equipo, y pierde el bando que se queda sin
+Pokémon.
+
+La búsqueda trabaja sobre un estado compacto (PS por posición y activo de cada
+bando) que se modifica y restaura en el lugar, con un hash Zobrist que se
+actualiza de forma incremental como clave de la tabla de transposición. Con
+el factor de ramificación de 6 contra 6 se ordenan primero el ataque de la
+tabla, los ataques por daño y los cambios por cómo queda el enfrentamiento, y
+se profundiza de a un nivel hasta agotar `time_limit_ms`.
+"""
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from .minimax import WIN_SCORE
+from .pokemon import Pokemon, damage_table, get_pokemon
+from .transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+MAX_TEAM_SIZE = 6
+# Las acciones son enteros: 0..n-1 son los ataques del activo y SWITCH + i cambia al Pokémon i.
+SWITCH = 100
+DEFAULT_TIME_LIMIT_MS = 200
+MAX_TEAM_DEPTH = 32
+AI, PLAYER = 0, 1
+_NONE = MAX_TEAM_SIZE  # "activo" de un bando sin Pokémon en pie
+
+def switch_to(slot: int) -> int:
+    return SWITCH + slot
+
+def is_switch(action: int) -> bool:
+    return action >= SWITCH
+
+class TeamState(NamedTuple):
+    ai_hp: Tuple[int, ...]
+    player_hp: Tuple[int, ...]
+    ai_active: int
+    player_active: int
+    ai_to_move: bool
+
+class TeamMatchup:
+    """Datos estáticos: daño de cada ataque de cada Pokémon contra cada rival y claves Zobrist."""
+
+    def __init__(self, ai_team: Sequence[Pokemon], player_team: Sequence[Pokemon], seed: int = 0):
+        for team in (ai_team, player_team):
+            if not 1 <= len(team) <= MAX_TEAM_SIZE:
+                raise ValueError(f"Un equipo debe tener entre 1 y {MAX_TEAM_SIZE} Pokémon")
+        # damage[bando][atacante][defensor] -> daño de cada ataque
+        self.damage = (
+            tuple(tuple(damage_table(a, p) for p in player_team) for a in ai_team),
+            tuple(tuple(damage_table(p, a) for a in ai_team) for p in player_team),
+        )
+        self.max_hp = (tuple(p.max_hp for p in ai_team), tuple(p.max_hp for p in player_team))
+        rng = random.Random(seed)
+        # Una clave por (bando, posición, PS), por (bando, activo) y una para el turno.
+        self.z_hp = tuple(tuple(tuple(rng.getrandbits(64) for _ in range(hp + 1)) for hp in side)
+                          for side in self.max_hp)
+        self.z_active = tuple(tuple(rng.getrandbits(64) for _ in range(MAX_TEAM_SIZE + 1)) for _ in range(2))
+        self.z_player_to_move = rng.getrandbits(64)
+
+    def hash(self, state: TeamState) -> int:
+        key = self.z_active[AI][state.ai_active] ^ self.z_active[PLAYER][state.player_active]
+        for side, hps in ((AI, state.ai_hp), (PLAYER, state.player_hp)):
+            for slot, hp in enumerate(hps):
+                key ^= self.z_hp[side][slot][max(hp, 0)]
+        return key if state.ai_to_move else key ^ self.z_player_to_move
+
+def _first_alive(hps: Sequence[int]) -> int:
+    for slot, hp in enumerate(hps):
+        if hp > 0:
+            return slot
+    return _NONE
+
+def legal_actions(matchup: TeamMatchup, state: TeamState) -> List[int]:
+    side = AI if state.ai_to_move else PLAYER
+    hps = state.ai_hp if side == AI else state.player_hp
+    active = state.ai_active if side == AI else state.player_active
+    if active == _NONE:
+        return []
+    other = state.player_active if side == AI else state.ai_active
+    attacks = len(matchup.damage[side][active][other]) if other != _NONE else 0
+    return list(range(attacks)) + [switch_to(slot) for slot, hp in enumerate(hps) if hp > 0 and slot != active]
+
+def apply_action(matchup: TeamMatchup, state: TeamState, action: int) -> TeamState:
+    """Estado tras la acción del bando que mueve, con el reemplazo automático si el rival se debilita."""
+    if state.ai_to_move:
+        if is_switch(action):
+            return state._replace(ai_active=action - SWITCH, ai_to_move=False)
+        hps = list(state.player_hp)
+        hps[state.player_active] -= matchup.damage[AI][state.ai_active][state.player_active][action]
+        active = state.player_active if hps[state.player_active] > 0 else _first_alive(hps)
+        return TeamState(state.ai_hp, tuple(hps), state.ai_active, active, False)
+    if is_switch(action):
+        return state._replace(player_active=action - SWITCH, ai_to_move=True)
+    hps = list(state.ai_hp)
+    hps[state.ai_active] -= matchup.damage[PLAYER][state.player_active][state.ai_active][action]
+    active = state.ai_active if hps[state.ai_active] > 0 else _first_alive(hps)
+    return TeamState(tuple(hps), state.player_hp, active, state.player_active, True)
+
+class _TeamSearchTimeout(Exception):
+    pass
+
+class _TeamSearch:
+    """Negamax alfa-beta con tabla de transposición sobre un estado mutable (hacer/deshacer)."""
+
+    def __init__(self, matchup: TeamMatchup, state: TeamState, tt: TranspositionTable,
+                 deadline: Optional[float] = None):
+        self.matchup = matchup
+        self.hp = [list(state.ai_hp), list(state.player_hp)]
+        self.active = [state.ai_active, state.player_active]
+        self.side = AI if state.ai_to_move else PLAYER
+        self.key = matchup.hash(state)
+        self.tt = tt
+        self.deadline = deadline
+        self.nodes = 0
+        self.history: Dict[Tuple[int, int], int] = {}
+
+    def _evaluate(self) -> int:
+        own = sum(hp for hp in self.hp[self.side] if hp > 0)
+        other = sum(hp for hp in self.hp[1 - self.side] if hp > 0)
+        return own - other
+
+    def _actions(self) -> List[int]:
+        side, other = self.side, 1 - self.side
+        active, target = self.active[side], self.active[other]
+        damages = self.matchup.damage[side][active][target]
+        actions = sorted(range(len(damages)), key=lambda a: -damages[a])
+        # Cambios: primero los que más daño harían al rival activo y menos recibirían de él.
+        switches = [slot for slot, hp in enumerate(self.hp[side]) if hp > 0 and slot != active]
+        switches.sort(key=lambda s: -(max(self.matchup.damage[side][s][target], default=0)
+                                      - max(self.matchup.damage[other][target][s], default=0)))
+        actions += [switch_to(slot) for slot in switches]
+        history = self.history
+        if history:
+            actions.sort(key=lambda a: -history.get((side, a), 0))
+        return actions
+
+    def _set_hp(self, side: int, slot: int, hp: int) -> None:
+        z = self.matchup.z_hp[side][slot]
+        self.key ^= z[max(self.hp[side][slot], 0)] ^ z[max(hp, 0)]
+        self.hp[side][slot] = hp
+
+    def _set_active(self, side: int, slot: int) -> None:
+        z = self.matchup.z_active[side]
+        self.key ^= z[self.active[side]] ^ z[slot]
+        self.active[side] = slot
+
+    def _do(self, action: int) -> Tuple[int, int, int]:
+        """Aplica la acción y devuelve lo necesario para deshacerla: (PS previos, activo previo del rival, activo previo propio)."""
+        side, other = self.side, 1 - self.side
+        undo = (self.hp[other][self.active[other]], self.active[other], self.active[side])
+        if is_switch(action):
+            self._set_active(side, action - SWITCH)
+        else:
+            target = self.active[other]
+            damage = self.matchup.damage[side][self.active[side]][target][action]
+            self._set_hp(other, target, self.hp[other][target] - damage)
+            if self.hp[other][target] <= 0:
+                self._set_active(other, _first_alive(self.hp[other]))
+        self.side = other
+        self.key ^= self.matchup.z_player_to_move
+        return undo
+
+    def _undo(self, undo: Tuple[int, int, int]) -> None:
+        self.key ^= self.matchup.z_player_to_move
+        self.side = side = 1 - self.side
+        other = 1 - side
+        old_hp, old_target, old_active = undo
+        self._set_active(other, old_target)
+        self._set_hp(other, old_target, old_hp)
+        self._set_active(side, old_active)
+
+    def negamax(self, depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if self.active[self.side] == _NONE:
+            return -WIN_SCORE
+        if depth == 0:
+            return self._evaluate()
+        if self.deadline is not None and self.nodes % 64 == 0 and time.perf_counter() > self.deadline:
+            raise _TeamSearchTimeout
+
+        key = self.key
+        alpha_orig = alpha
+        actions = self._actions()
+        entry = self.tt.lookup(key, depth)
+        if entry is not None:
+            if entry.flag == EXACT:
+                return entry.score
+            if entry.flag == LOWER_BOUND and entry.score >= beta:
+                return entry.score
+            if entry.flag == UPPER_BOUND and entry.score <= alpha:
+                return entry.score
+        else:
+            entry = self.tt.probe(key)
+        if entry is not None and entry.best_move in actions:
+            actions.remove(entry.best_move)
+            actions.insert(0, entry.best_move)
+
+        best = -WIN_SCORE - 1
+        best_action = actions[0]
+        for action in actions:
+            undo = self._do(action)
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha)
+            finally:
+                self._undo(undo)
+            if score > best:
+                best = score
+                best_action = action
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                key_h = (self.side, action)
+                self.history[key_h] = self.history.get(key_h, 0) + depth * depth
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, best, best_action)
+        return best
+
+    def root(self, depth: int, first: Optional[int]) -> Tuple[int, int]:
+        actions = self._actions()
+        if first in actions:
+            actions.remove(first)
+            actions.insert(0, first)
+        best_action, best = actions[0], -WIN_SCORE - 1
+        for action in actions:
+            undo = self._do(action)
+            try:
+                score = -self.negamax(depth - 1, -WIN_SCORE - 1, -best)
+            finally:
+                self._undo(undo)
+            if score > best:
+                best, best_action = score, action
+        return best_action, best
+
+def team_decision(matchup: TeamMatchup, state: TeamState, time_limit_ms: float = DEFAULT_TIME_LIMIT_MS,
+                  tt: Optional[TranspositionTable] = None, max_depth: int = MAX_TEAM_DEPTH) -> Tuple[int, int, int]:
+    """(acción, puntaje, profundidad completada) para el bando que mueve, por profundización iterativa.
+
+    La profundidad 1 se completa siempre; las siguientes solo si terminan antes de `time_limit_ms`.
+    """
+    deadline = time.perf_counter() + time_limit_ms / 1000
+    tt = tt if tt is not None else TranspositionTable()
+    search = _TeamSearch(matchup, state, tt)
+    best_action, best_score = search.root(1, None)
+    completed = 1
+    search.deadline = deadline
+    while completed < max_depth and abs(best_score) != WIN_SCORE:
+        try:
+            best_action, best_score = search.root(completed + 1, best_action)
+        except _TeamSearchTimeout:
+            break
+        completed += 1
+    return best_action, best_score, completed
+
+@dataclass
+class TeamBattleState:
+    current_turn: str  # 'player' o 'ai'
+    game_over: bool = False
+    winner: Optional[str] = None
+    last_move: Optional[str] = None
+
+class TeamBattle:
+    """Como BattleSystem, pero con un equipo por bando; los Pokémon reflejan siempre los PS del estado."""
+
+    def __init__(self, player_names: Sequence[str], ai_names: Sequence[str],
+                 time_limit_ms: float = DEFAULT_TIME_LIMIT_MS, max_depth: int = MAX_TEAM_DEPTH):
+        self.player_team = [get_pokemon(name) for name in player_names]
+        self.ai_team = [get_pokemon(name) for name in ai_names]
+        self.matchup = TeamMatchup(self.ai_team, self.player_team)
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        # La tabla sirve para todo el combate: las claves Zobrist no dependen del turno en que se calcularon.
+        self.tt = TranspositionTable()
+        self.team_state = TeamState(tuple(p.current_hp for p in self.ai_team),
+                                    tuple(p.current_hp for p in self.player_team), 0, 0, False)
+        self.state = TeamBattleState(current_turn='player')
+
+    @property
+    def ai_pokemon(self) -> Pokemon:
+        return self.ai_team[self.team_state.ai_active]
+
+    @property
+    def player_pokemon(self) -> Pokemon:
+        return self.player_team[self.team_state.player_active]
+
+    def legal_actions(self) -> List[int]:
+        return legal_actions(self.matchup, self.team_state)
+
+    def ai_action(self) -> int:
+        return team_decision(self.matchup, self.team_state, self.time_limit_ms, self.tt, self.max_depth)[0]
+
+    def execute_move(self, action: int) -> bool:
+        """Acción del bando al que le toca; con -1 en el turno de la IA decide la búsqueda."""
+        if self.state.game_over:
+            return True
+        ai_turn = self.state.current_turn == 'ai'
+        if ai_turn and action == -1:
+            action = self.ai_action()
+        if action not in self.legal_actions():
+            raise ValueError(f"Acción no válida: {action}")
+
+        team, rivals = (self.ai_team, self.player_team) if ai_turn else (self.player_team, self.ai_team)
+        before = self.team_state
+        attacker_slot = before.ai_active if ai_turn else before.player_active
+        attacker = team[attacker_slot]
+        defender_slot = before.player_active if ai_turn else before.ai_active
+        self.team_state = after = apply_action(self.matchup, before, action)
+        for pokemon, hp in zip(self.ai_team, after.ai_hp):
+            pokemon.current_hp = hp
+        for pokemon, hp in zip(self.player_team, after.player_hp):
+            pokemon.current_hp = hp
+
+        if is_switch(action):
+            self.state.last_move = f"{attacker.name} vuelve; entra {team[action - SWITCH].name}"
+        else:
+            defender = rivals[defender_slot]
+            damage = self.matchup.damage[AI if ai_turn else PLAYER][attacker_slot][defender_slot][action]
+            self.state.last_move = f"{attacker.name} usó {attacker.attacks[action].name} ({damage} de daño)"
+            if defender.current_hp <= 0:
+                replacement = after.player_active if ai_turn else after.ai_active
+                if replacement == _NONE:
+                    self.state.game_over = True
+                    self.state.winner = 'ai' if ai_turn else 'player'
+                else:
+                    self.state.last_move += f"; {defender.name} se debilitó, entra {rivals[replacement].name}"
+        if not self.state.game_over:
+            self.state.current_turn = 'player' if ai_turn else 'ai'
+        return self.state.game_over
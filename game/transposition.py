@@ -0,0 +1,81 @@
+# transposition.py
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+class TTEntry(NamedTuple):
+    depth: int
+    flag: int
+    score: int
+    best_move: int
+
+class TranspositionTable:
+    """Tabla de transposición con tope de entradas y desalojo LRU.
+
+    Las claves son estados compactos (ai_hp, player_hp, turno) de un único
+    enfrentamiento, por eso cada BattleSystem tiene su propia tabla y la
+    conserva entre turnos.
+    """
+
+    def __init__(self, max_entries: int = 200_000):
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser positivo")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, TTEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def probe(self, key: Hashable) -> Optional[TTEntry]:
+        """Devuelve la entrada sin contarla como acierto ni fallo (solo para ordenar movimientos)."""
+        return self._entries.get(key)
+
+    def lookup(self, key: Hashable, depth: int) -> Optional[TTEntry]:
+        """Entrada buscada exactamente a `depth`, o None.
+
+        Solo se reutilizan puntajes de la misma profundidad: una búsqueda más
+        profunda puede dar otro valor y la decisión dejaría de coincidir con
+        minimax a profundidad fija.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.depth != depth:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key: Hashable, depth: int, flag: int, score: int, best_move: int) -> None:
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = TTEntry(depth, flag, score, best_move)
+        self.stores += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,277 @@
+# tune.py
+"""Ajuste de los pesos de game.evaluation con partidas de autojuego.
+
+    python -m game.tune fit --games 8 --jobs 8 --output data/eval_weights.json
+    python -m game.tune match --weights data/eval_weights.json --depth 1 --baseline-depth 2
+
+`fit` juega en paralelo combates minimax contra minimax para todos los pares
+de especies, con PS iniciales al azar y una fracción `epsilon` de jugadas al
+azar para variar las posiciones, y guarda cada posición con el resultado del
+combate (1 si ganó la IA, 0 si perdió, 0.5 si empató). Con `--labels exact` el
+resultado es el valor teórico del estado según game.endgame en lugar del que
+se dio en la partida.
+
+Los pesos se ajustan al estilo Texel: se elige la escala K que mejor predice
+los resultados con la evaluación original y luego una búsqueda local mueve
+cada peso mientras baje el error cuadrático medio entre sigmoid(eval / K) y el
+resultado. La evaluación es lineal en los pesos, así que cada prueba es un
+producto matriz-vector de NumPy. Una de cada cinco partidas queda fuera del
+ajuste para medir el error de validación.
+
+`match` enfrenta la evaluación ajustada contra la original, en los dos papeles
+y para todos los pares, y mide el tiempo por decisión de cada lado.
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from .evaluation import DEFAULT_WEIGHTS, DEFAULT_WEIGHTS_PATH, FEATURES, Evaluator, Weights
+from .minimax import minimax_decision
+from .pokemon import calculate_damage, get_all_pokemon_names, get_pokemon
+
+DEFAULT_MAX_TURNS = 200
+VALIDATION_EVERY = 5  # una de cada cinco partidas se reserva para validar
+
+class SelfPlaySpec(NamedTuple):
+    ai: str
+    player: str
+    ai_hp: int
+    player_hp: int
+    depth: int
+    epsilon: float
+    seed: int
+    max_turns: int
+
+# (especie IA, especie jugador, PS IA, PS jugador, turno de la IA)
+Position = Tuple[str, str, int, int, bool]
+
+def self_play(spec: SelfPlaySpec) -> Tuple[List[Position], float]:
+    """Juega un combate y devuelve sus posiciones no terminales y el resultado para la IA."""
+    ai, player = get_pokemon(spec.ai), get_pokemon(spec.player)
+    ai.current_hp, player.current_hp = spec.ai_hp, spec.player_hp
+    rng = random.Random(spec.seed)
+    positions: List[Position] = []
+    ai_to_move = False  # como en BattleSystem, empieza el jugador
+    for _ in range(spec.max_turns):
+        if ai.current_hp <= 0 or player.current_hp <= 0:
+            break
+        positions.append((ai.name, player.name, ai.current_hp, player.current_hp, ai_to_move))
+        attacker, defender = (ai, player) if ai_to_move else (player, ai)
+        if rng.random() < spec.epsilon:
+            index = rng.randrange(len(attacker.attacks))
+        else:
+            index = minimax_decision(attacker, defender, spec.depth)
+        defender.current_hp -= calculate_damage(attacker, defender, attacker.attacks[index])
+        ai_to_move = not ai_to_move
+    result = 1.0 if player.current_hp <= 0 else 0.0 if ai.current_hp <= 0 else 0.5
+    return positions, result
+
+def self_play_specs(games: int, depth: int, epsilon: float, seed: int = 0,
+                    max_turns: int = DEFAULT_MAX_TURNS) -> Iterator[SelfPlaySpec]:
+    """`games` combates por par ordenado de especies distintas, con PS iniciales entre 1/4 y el máximo."""
+    rng = random.Random(seed)
+    names = get_all_pokemon_names()
+    pairs = list(itertools.permutations(names, 2))
+    for n, (ai_name, player_name) in enumerate(pairs * games):
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        yield SelfPlaySpec(ai.name, player.name, rng.randint(ai.max_hp // 4, ai.max_hp),
+                           rng.randint(player.max_hp // 4, player.max_hp), depth, epsilon, seed + n, max_turns)
+
+def collect(specs: List[SelfPlaySpec], jobs: int) -> List[Tuple[List[Position], float]]:
+    if jobs <= 1:
+        return list(map(self_play, specs))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(self_play, specs, chunksize=16))
+
+def exact_labels(positions: List[Position]) -> np.ndarray:
+    """Resultado teórico de cada posición con el solucionador exacto (una tabla por par de especies)."""
+    from .endgame import solve_pokemon
+
+    tables = {}
+    labels = np.empty(len(positions))
+    for i, (ai, player, ai_hp, player_hp, ai_to_move) in enumerate(positions):
+        table = tables.get((ai, player))
+        if table is None:
+            table = tables[(ai, player)] = solve_pokemon(get_pokemon(ai), get_pokemon(player))
+        value = table.value(ai_hp, player_hp, ai_to_move)
+        labels[i] = 1.0 if value > 0 else 0.0 if value < 0 else 0.5
+    return labels
+
+def feature_matrix(positions: List[Position]) -> np.ndarray:
+    evaluators: Dict[Tuple[str, str], Evaluator] = {}
+    rows = []
+    for ai, player, ai_hp, player_hp, ai_to_move in positions:
+        evaluator = evaluators.get((ai, player))
+        if evaluator is None:
+            evaluator = evaluators[(ai, player)] = Evaluator(DEFAULT_WEIGHTS, get_pokemon(ai), get_pokemon(player))
+        rows.append(evaluator.features(ai_hp, player_hp, ai_to_move))
+    return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURES))
+
+def loss(X: np.ndarray, y: np.ndarray, weights: np.ndarray, k: float) -> float:
+    """Error cuadrático medio entre sigmoid(eval / k) y el resultado."""
+    predicted = 1.0 / (1.0 + np.exp(-np.clip(X @ weights / k, -50, 50)))
+    return float(np.mean((y - predicted) ** 2))
+
+def fit_k(X: np.ndarray, y: np.ndarray, weights: np.ndarray) -> float:
+    """Escala de la sigmoide que mejor predice los resultados con `weights` (búsqueda en escala logarítmica)."""
+    grid = np.logspace(0, 4, 41)
+    best = min(grid, key=lambda k: loss(X, y, weights, k))
+    low, high = np.log(best) - 0.12, np.log(best) + 0.12
+    for _ in range(40):  # sección áurea alrededor del mejor punto de la grilla
+        a, b = low + (high - low) * 0.382, low + (high - low) * 0.618
+        if loss(X, y, weights, np.exp(a)) < loss(X, y, weights, np.exp(b)):
+            high = b
+        else:
+            low = a
+    return float(np.exp((low + high) / 2))
+
+def texel(X: np.ndarray, y: np.ndarray, start: np.ndarray, k: float, min_step: float = 1e-3,
+          max_passes: int = 200) -> Tuple[np.ndarray, float]:
+    """Búsqueda local por coordenadas; cada paso empieza en proporción a la escala de su rasgo."""
+    weights = start.astype(np.float64).copy()
+    spread = X.std(axis=0)
+    spread[spread == 0] = 1.0
+    steps = 0.25 * float(np.std(X @ weights)) / spread
+    best = loss(X, y, weights, k)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(len(weights)):
+            for direction in (1.0, -1.0):
+                trial = weights.copy()
+                trial[i] += direction * steps[i]
+                trial_loss = loss(X, y, trial, k)
+                if trial_loss < best:
+                    weights, best, improved = trial, trial_loss, True
+                    break
+        if not improved:
+            steps /= 2
+            if np.all(steps * spread < min_step * k):
+                break
+    return weights, best
+
+def fit(games: int, depth: int, epsilon: float, labels: str, jobs: int, seed: int = 0) -> Dict:
+    start = time.perf_counter()
+    specs = list(self_play_specs(games, depth, epsilon, seed))
+    played = collect(specs, jobs)
+    positions: List[Position] = []
+    results: List[float] = []
+    validation: List[bool] = []
+    for n, (game_positions, result) in enumerate(played):
+        positions.extend(game_positions)
+        results.extend([result] * len(game_positions))
+        validation.extend([n % VALIDATION_EVERY == 0] * len(game_positions))
+    played_seconds = time.perf_counter() - start
+
+    X = feature_matrix(positions)
+    y = exact_labels(positions) if labels == "exact" else np.array(results)
+    held_out = np.array(validation)
+    X_train, y_train, X_valid, y_valid = X[~held_out], y[~held_out], X[held_out], y[held_out]
+    initial = np.array(DEFAULT_WEIGHTS.as_tuple())
+    k = fit_k(X_train, y_train, initial)
+    weights, train_loss = texel(X_train, y_train, initial, k)
+    return {
+        "weights": Weights.from_tuple(weights),
+        "k": k,
+        "labels": labels,
+        "games": len(specs),
+        "positions": len(positions),
+        "depth": depth,
+        "epsilon": epsilon,
+        "initial_train_loss": loss(X_train, y_train, initial, k),
+        "train_loss": train_loss,
+        "initial_validation_loss": loss(X_valid, y_valid, initial, k),
+        "validation_loss": loss(X_valid, y_valid, weights, k),
+        "self_play_seconds": played_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+class MatchSpec(NamedTuple):
+    ai: str
+    player: str
+    ai_weights: Optional[Weights]
+    ai_depth: int
+    player_weights: Optional[Weights]
+    player_depth: int
+    max_turns: int
+
+def play_match(spec: MatchSpec) -> Tuple[float, float, float]:
+    """(resultado para la IA, segundos de decisión de la IA, segundos de decisión del jugador)."""
+    ai, player = get_pokemon(spec.ai), get_pokemon(spec.player)
+    spent = [0.0, 0.0]
+    ai_to_move = False
+    for _ in range(spec.max_turns):
+        if ai.current_hp <= 0 or player.current_hp <= 0:
+            break
+        attacker, defender = (ai, player) if ai_to_move else (player, ai)
+        weights, depth = (spec.ai_weights, spec.ai_depth) if ai_to_move else (spec.player_weights, spec.player_depth)
+        begin = time.perf_counter()
+        index = minimax_decision(attacker, defender, depth, weights=weights)
+        spent[0 if ai_to_move else 1] += time.perf_counter() - begin
+        defender.current_hp -= calculate_damage(attacker, defender, attacker.attacks[index])
+        ai_to_move = not ai_to_move
+    result = 1.0 if player.current_hp <= 0 else 0.0 if ai.current_hp <= 0 else 0.5
+    return result, spent[0], spent[1]
+
+def match(weights: Weights, depth: int, baseline_depth: int, jobs: int,
+          max_turns: int = DEFAULT_MAX_TURNS) -> Dict:
+    """Evaluación ajustada contra la original, con cada una en los dos papeles."""
+    specs = []
+    for ai, player in itertools.permutations(get_all_pokemon_names(), 2):
+        specs.append(MatchSpec(ai, player, weights, depth, None, baseline_depth, max_turns))
+        specs.append(MatchSpec(ai, player, None, baseline_depth, weights, depth, max_turns))
+    if jobs <= 1:
+        results = list(map(play_match, specs))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(play_match, specs, chunksize=16))
+    score = tuned_time = baseline_time = 0.0
+    for spec, (result, ai_seconds, player_seconds) in zip(specs, results):
+        tuned_is_ai = spec.ai_weights is not None
+        score += result if tuned_is_ai else 1.0 - result
+        tuned_time += ai_seconds if tuned_is_ai else player_seconds
+        baseline_time += player_seconds if tuned_is_ai else ai_seconds
+    return {
+        "games": len(specs),
+        "tuned_score": score / len(specs),
+        "tuned_depth": depth,
+        "baseline_depth": baseline_depth,
+        "tuned_seconds": tuned_time,
+        "baseline_seconds": baseline_time,
+    }
+
+def main() -> None:
+    import json
+
+    parser = argparse.ArgumentParser(description="Ajuste de la evaluación estática con autojuego")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit_cmd = sub.add_parser("fit", help="juega, ajusta los pesos y los guarda")
+    fit_cmd.add_argument("--games", type=int, default=4, help="combates por cada par de especies")
+    fit_cmd.add_argument("--depth", type=int, default=2, help="profundidad de minimax en el autojuego")
+    fit_cmd.add_argument("--epsilon", type=float, default=0.1, help="fracción de jugadas al azar")
+    fit_cmd.add_argument("--labels", choices=("selfplay", "exact"), default="selfplay")
+    fit_cmd.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    fit_cmd.add_argument("--seed", type=int, default=0)
+    fit_cmd.add_argument("--output", type=Path, default=DEFAULT_WEIGHTS_PATH)
+    match_cmd = sub.add_parser("match", help="enfrenta los pesos ajustados con la evaluación original")
+    match_cmd.add_argument("--weights", type=Path, default=DEFAULT_WEIGHTS_PATH)
+    match_cmd.add_argument("--depth", type=int, default=1, help="profundidad con los pesos ajustados")
+    match_cmd.add_argument("--baseline-depth", type=int, default=2, help="profundidad de la evaluación original")
+    match_cmd.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        report = fit(args.games, args.depth, args.epsilon, args.labels, args.jobs, args.seed)
+        weights = report.pop("weights")
+        weights.save(args.output, **report)
+        print(json.dumps(dict(weights=weights.as_tuple(), **report), indent=2))
+        print(f"Pesos escritos en {args.output}")
+    else:
+        print(json.dumps(match(Weights.load(args.weights), args.depth, args.baseline_depth, args.jobs), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import pytest
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    # La línea base guarda solo las estadísticas: las muestras de cada ronda ocupan megabytes.
+    for bench in output_json["benchmarks"]:
+        bench["stats"].pop("data", None)
@@ -0,0 +1,59 @@
+# reference.py
+"""Implementaciones de referencia contra las que se comparan las búsquedas optimizadas."""
+import copy
+import itertools
+from typing import Iterator, Sequence, Tuple
+from game.minimax import evaluate_state
+from game.pokemon import Pokemon, calculate_damage, get_all_pokemon_names, get_pokemon, is_fainted
+
+# Fracciones de PS (IA, jugador) de las posiciones que se prueban para cada par de especies.
+HP_FRACTIONS = ((1.0, 1.0), (0.5, 1.0), (1.0, 0.3), (0.2, 0.2))
+
+def _reference_minimax(ai: Pokemon, player: Pokemon, depth: int, is_maximizing: bool, alpha, beta) -> int:
+    """El minimax original, nodo a nodo sobre copias de Pokemon."""
+    if depth == 0 or is_fainted(ai) or is_fainted(player):
+        return evaluate_state(ai, player)
+    if is_maximizing:
+        max_eval = -float('inf')
+        for attack in ai.attacks:
+            new_player = copy.deepcopy(player)
+            new_player.current_hp -= calculate_damage(ai, new_player, attack)
+            eval = _reference_minimax(ai, new_player, depth - 1, False, alpha, beta)
+            max_eval = max(max_eval, eval)
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                break
+        return max_eval
+    min_eval = float('inf')
+    for attack in player.attacks:
+        new_ai = copy.deepcopy(ai)
+        new_ai.current_hp -= calculate_damage(player, new_ai, attack)
+        eval = _reference_minimax(new_ai, player, depth - 1, True, alpha, beta)
+        min_eval = min(min_eval, eval)
+        beta = min(beta, eval)
+        if beta <= alpha:
+            break
+    return min_eval
+
+def reference_decision(ai: Pokemon, player: Pokemon, depth: int) -> Tuple[int, int]:
+    best_score = -float('inf')
+    best_index = 0
+    for i, attack in enumerate(ai.attacks):
+        simulated_player = copy.deepcopy(player)
+        simulated_player.current_hp -= calculate_damage(ai, simulated_player, attack)
+        score = _reference_minimax(ai, simulated_player, depth - 1, False, -float('inf'), float('inf'))
+        if score > best_score:
+            best_score = score
+            best_index = i
+    return best_index, best_score
+
+def roster_pairs() -> Sequence[Tuple[str, str]]:
+    names = get_all_pokemon_names()
+    return list(itertools.product(names, repeat=2))
+
+def positions(ai_name: str, player_name: str) -> Iterator[Tuple[Pokemon, Pokemon]]:
+    for ai_frac, player_frac in HP_FRACTIONS:
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        ai.current_hp = max(1, int(ai.max_hp * ai_frac))
+        player.current_hp = max(1, int(player.max_hp * player_frac))
+        yield ai, player
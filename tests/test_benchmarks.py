@@ -0,0 +1,71 @@
+"""Costo de las rutas críticas: nodos visitados y tiempos con pytest-benchmark.
+
+Los nodos de cada decisión no dependen de la máquina, así que se comparan
+exactamente y una regresión de la poda u orden de jugadas falla siempre. Los
+tiempos se comparan con tests/benchmarks/baseline.json solo como aviso; ver
+docs/documentacion.md para compararlos y para regenerar la línea base.
+"""
+import itertools
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from game.minimax import decision_with_stats, evaluate_state, minimax, minimax_decision
+from game.pokemon import PokemonLoader, calculate_damage, get_all_pokemon_names, get_pokemon
+from game.simulate import GameSpec, play_game
+
+@pytest.fixture
+def lapras_vs_jigglypuff():
+    return get_pokemon("lapras"), get_pokemon("jigglypuff")
+
+# Nodos de decision_with_stats para Lapras contra Jigglypuff, por profundidad, y
+# para todos los pares del roster a MAX_DEPTH. Si un cambio los altera a
+# propósito, se actualizan acá en el mismo commit.
+NODE_COUNTS = {2: 7, 4: 24, 6: 65, 8: 86}
+ALL_PAIRS_NODES = 1440
+
+@pytest.mark.parametrize("depth", sorted(NODE_COUNTS))
+def test_minimax_decision_nodes(lapras_vs_jigglypuff, depth):
+    _, stats = decision_with_stats(*lapras_vs_jigglypuff, depth)
+    assert stats.nodes == NODE_COUNTS[depth]
+
+def test_minimax_decision_all_pairs_nodes():
+    names = get_all_pokemon_names()
+    nodes = sum(decision_with_stats(get_pokemon(a), get_pokemon(b))[1].nodes
+                for a, b in itertools.product(names, repeat=2))
+    assert nodes == ALL_PAIRS_NODES
+
+@pytest.mark.benchmark(group="damage")
+def test_calculate_damage(benchmark, lapras_vs_jigglypuff):
+    lapras, jigglypuff = lapras_vs_jigglypuff
+    benchmark(calculate_damage, lapras, jigglypuff, lapras.attacks[1])
+
+@pytest.mark.benchmark(group="damage")
+def test_evaluate_state(benchmark, lapras_vs_jigglypuff):
+    benchmark(evaluate_state, *lapras_vs_jigglypuff)
+
+@pytest.mark.benchmark(group="minimax")
+@pytest.mark.parametrize("depth", (2, 4, 6, 8))
+def test_minimax(benchmark, lapras_vs_jigglypuff, depth):
+    lapras, jigglypuff = lapras_vs_jigglypuff
+    benchmark(minimax, lapras, jigglypuff, depth, True, -float('inf'), float('inf'))
+
+@pytest.mark.benchmark(group="minimax")
+@pytest.mark.parametrize("depth", (2, 4, 6, 8))
+def test_minimax_decision(benchmark, lapras_vs_jigglypuff, depth):
+    lapras, jigglypuff = lapras_vs_jigglypuff
+    benchmark(minimax_decision, lapras, jigglypuff, depth)
+
+@pytest.mark.benchmark(group="minimax")
+def test_minimax_decision_all_pairs(benchmark):
+    pairs = [(get_pokemon(a), get_pokemon(b)) for a, b in itertools.product(get_all_pokemon_names(), repeat=2)]
+    benchmark(lambda: [minimax_decision(a, b) for a, b in pairs])
+
+@pytest.mark.benchmark(group="startup")
+def test_pokemon_loader_startup(benchmark):
+    benchmark(lambda: PokemonLoader().pokemon_db)
+
+@pytest.mark.benchmark(group="battles")
+def test_headless_battles(benchmark):
+    specs = [GameSpec(a, b, "minimax", 2, 0, 200) for a, b in itertools.permutations(get_all_pokemon_names(), 2)]
+    benchmark.pedantic(lambda: [play_game(spec) for spec in specs], rounds=5, iterations=1)
@@ -0,0 +1,89 @@
+import functools
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game.endgame import solve_matchup, solve_pokemon
+from game.minimax import WIN_SCORE, Matchup
+from game.pokemon import get_pokemon
+from .reference import roster_pairs
+
+def _synthetic_matchup(rng: random.Random) -> Matchup:
+    matchup = Matchup.__new__(Matchup)
+    matchup.ai_damage = tuple(rng.choice((0, 0, 1, 2, 3, 5, 7)) for _ in range(rng.randint(1, 3)))
+    matchup.player_damage = tuple(rng.choice((0, 0, 1, 2, 3, 5, 7)) for _ in range(rng.randint(1, 3)))
+    matchup.evaluate = None
+    return matchup
+
+def _reference_values(matchup: Matchup):
+    """Minimax memoizado con la escala de la tabla: ganar en n jugadas vale WIN_SCORE - n."""
+    @functools.lru_cache(maxsize=None)
+    def value(ai_hp: int, player_hp: int, ai_to_move: bool, depth: int) -> int:
+        if player_hp <= 0:
+            return WIN_SCORE
+        if ai_hp <= 0:
+            return -WIN_SCORE
+        if depth == 0:
+            return 0  # nadie terminó el combate: ataques sin daño en bucle
+        if ai_to_move:
+            best = max(value(ai_hp, player_hp - d, False, depth - 1) for d in matchup.ai_damage)
+        else:
+            best = min(value(ai_hp - d, player_hp, True, depth - 1) for d in matchup.player_damage)
+        return best - (best > 0) + (best < 0)
+    return value
+
+@pytest.mark.parametrize("seed", range(40))
+def test_values_match_memoized_minimax(seed):
+    rng = random.Random(seed)
+    matchup = _synthetic_matchup(rng)
+    max_ai_hp, max_player_hp = rng.randint(1, 12), rng.randint(1, 12)
+    table = solve_matchup(matchup, max_ai_hp, max_player_hp)
+    value = _reference_values(matchup)
+    # Más jugadas que las necesarias para terminar cualquier combate que pueda terminar.
+    horizon = 4 * (max_ai_hp + max_player_hp) + 6
+    for ai_hp in range(1, max_ai_hp + 1):
+        for player_hp in range(1, max_player_hp + 1):
+            for ai_to_move in (True, False):
+                assert table.value(ai_hp, player_hp, ai_to_move) == value(ai_hp, player_hp, ai_to_move, horizon)
+
+def _shift(values):
+    return values - (values > 0) + (values < 0)
+
+@pytest.mark.parametrize("ai_name,player_name", roster_pairs())
+def test_roster_tables_are_consistent(ai_name, player_name):
+    """Cada estado vale lo que su mejor ataque, y ese ataque es el primero con el valor óptimo."""
+    ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+    matchup = Matchup(ai, player)
+    table = solve_pokemon(ai, player)
+    value_ai, value_player = table.values.astype(np.int32)
+    ai_hp, player_hp = np.indices(value_ai.shape)
+    ai_hp, player_hp = ai_hp[1:, 1:], player_hp[1:, 1:]
+
+    ai_options = np.stack([_shift(value_player[ai_hp, np.maximum(player_hp - d, 0)]) for d in matchup.ai_damage])
+    player_options = np.stack([_shift(value_ai[np.maximum(ai_hp - d, 0), player_hp]) for d in matchup.player_damage])
+    moves_ai, moves_player = table.best_moves[:, 1:, 1:].astype(np.int64)
+    assert (ai_options.max(axis=0) == value_ai[1:, 1:]).all()
+    assert (player_options.min(axis=0) == value_player[1:, 1:]).all()
+    assert (moves_ai == ai_options.argmax(axis=0)).all()
+    assert (moves_player == player_options.argmin(axis=0)).all()
+    assert (np.abs(value_ai[1:, 1:]) < WIN_SCORE).all()
+
+def test_policy_book_matches_tables(tmp_path):
+    from game.policy import PolicyBook, build
+
+    path = tmp_path / "policy.bin"
+    build(path)
+    book = PolicyBook.open(path)
+    assert book is not None
+    try:
+        for ai_name, player_name in roster_pairs()[::5]:
+            table = solve_pokemon(get_pokemon(ai_name), get_pokemon(player_name))
+            view = book.view(ai_name, player_name)
+            for ai_hp in range(1, table.max_ai_hp + 1, 3):
+                for player_hp in range(1, table.max_player_hp + 1, 3):
+                    for ai_to_move in (True, False):
+                        assert (view.best_move(ai_hp, player_hp, ai_to_move)
+                                == table.best_move(ai_hp, player_hp, ai_to_move))
+    finally:
+        book.close()
@@ -0,0 +1,29 @@
+import math
+import pytest
+from game.evaluation import DEFAULT_WEIGHTS, Evaluator, Weights
+from game.minimax import WIN_SCORE, Matchup, root_search
+from game.pokemon import get_pokemon
+from .reference import reference_decision, roster_pairs
+
+WEIGHTS = (DEFAULT_WEIGHTS, Weights(0.7, 0.4, 3.0, 0.25), Weights(0.0, 1.0, -2.0, 0.5))
+
+@pytest.mark.parametrize("weights", WEIGHTS)
+def test_evaluator_is_weighted_sum_of_features(weights):
+    for ai_name, player_name in roster_pairs()[::4]:
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        evaluate = Evaluator(weights, ai, player)
+        for ai_hp in range(1, ai.max_hp + 1, 7):
+            for player_hp in range(1, player.max_hp + 1, 5):
+                for ai_to_move in (True, False):
+                    dot = sum(w * f for w, f in zip(weights.as_tuple(),
+                                                    evaluate.features(ai_hp, player_hp, ai_to_move)))
+                    expected = max(1 - WIN_SCORE, min(WIN_SCORE - 1, math.floor(dot + 0.5)))
+                    assert evaluate(ai_hp, player_hp, ai_to_move) == expected
+
+def test_default_weights_keep_original_search():
+    for ai_name, player_name in roster_pairs()[::3]:
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        matchup = Matchup(ai, player, DEFAULT_WEIGHTS)
+        assert matchup.evaluate is None
+        for depth in (1, 3):
+            assert root_search(matchup, ai.current_hp, player.current_hp, depth) == reference_decision(ai, player, depth)
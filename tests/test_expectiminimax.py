@@ -0,0 +1,43 @@
+import itertools
+import pytest
+from game.minimax import WIN_SCORE, StochasticMatchup, expectiminimax
+from game.pokemon import Ruleset, get_all_pokemon_names, get_pokemon
+
+def _brute(matchup: StochasticMatchup, ai_hp: int, player_hp: int, depth: int, ai_to_move: bool) -> float:
+    """Expectiminimax sin poda: máximo o mínimo de la esperanza de cada ataque."""
+    if player_hp <= 0:
+        return WIN_SCORE
+    if ai_hp <= 0:
+        return -WIN_SCORE
+    if depth == 0:
+        return ai_hp - player_hp
+    if ai_to_move:
+        return max(sum(p * _brute(matchup, ai_hp, player_hp - d, depth - 1, False) for p, d in outcome)
+                   for outcome in matchup.ai_outcomes)
+    return min(sum(p * _brute(matchup, ai_hp - d, player_hp, depth - 1, True) for p, d in outcome)
+               for outcome in matchup.player_outcomes)
+
+def _brute_root(matchup: StochasticMatchup, ai_hp: int, player_hp: int, depth: int):
+    values = [sum(p * _brute(matchup, ai_hp, player_hp - d, depth - 1, False) for p, d in outcome)
+              for outcome in matchup.ai_outcomes]
+    return values
+
+RULESETS = {
+    "default": Ruleset(),
+    "no_accuracy": Ruleset(use_accuracy=False, damage_buckets=2),
+}
+
+@pytest.mark.parametrize("rules", RULESETS.values(), ids=RULESETS.keys())
+@pytest.mark.parametrize("depth", (1, 2, 3))
+def test_pruned_search_matches_brute_force(rules, depth):
+    names = get_all_pokemon_names()[:6]
+    for ai_name, player_name in itertools.product(names, repeat=2):
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        matchup = StochasticMatchup(ai, player, rules)
+        for ai_frac, player_frac in ((1.0, 1.0), (0.5, 1.0), (1.0, 0.3), (0.2, 0.25)):
+            ai_hp, player_hp = max(1, int(ai.max_hp * ai_frac)), max(1, int(player.max_hp * player_frac))
+            values = _brute_root(matchup, ai_hp, player_hp, depth)
+            index, score = expectiminimax(matchup, ai_hp, player_hp, depth)
+            assert score == pytest.approx(max(values), abs=1e-6)
+            # Ante empates cualquier ataque óptimo vale; el elegido debe serlo.
+            assert values[index] == pytest.approx(max(values), abs=1e-6)
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from game.battle import BattleSystem
+from game.engines import MCTSEngine
+from game.mcts import Node, Tree, _worker_search, best_action, compile_outcomes, mcts_decision, parallel_search
+from game.minimax import Matchup
+from game.pokemon import damage_table, get_pokemon
+from .reference import roster_pairs
+
+def _one_hit_positions():
+    """Pares donde solo el ataque más fuerte debilita al rival ya y cualquier
+    respuesta del rival debilita a la IA: (ia, jugador, PS del jugador, ataque)."""
+    for ai_name, player_name in roster_pairs():
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        damages = damage_table(ai, player)
+        best = max(damages)
+        if best > 0 and damages.count(best) == 1 and min(damage_table(player, ai)) > 0:
+            yield ai, player, best, damages.index(best)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_picks_forced_win(seed):
+    positions = list(_one_hit_positions())
+    assert positions
+    for ai, player, player_hp, winning in positions:
+        matchup = Matchup(ai, player)
+        assert mcts_decision(matchup, 1, player_hp, iterations=300, seed=seed) == winning
+
+def test_best_action_ties_and_terminal_root():
+    assert best_action([3, 5, 5]) == 1
+    assert best_action([0, 0]) == 0
+    ai, player = get_pokemon("pikachu"), get_pokemon("charmander")
+    outcomes = compile_outcomes(Matchup(ai, player))
+    # Con el rival ya debilitado no hay nada que buscar: la raíz no acumula visitas.
+    tree = Tree(outcomes, Node(ai.max_hp, 0, True, len(outcomes[0])), rng=None)
+    tree.run(50)
+    assert tree.root.action_visits == [0] * len(outcomes[0])
+    assert best_action(tree.root.action_visits) == 0
+
+def test_tree_is_reused_between_turns():
+    engine = MCTSEngine(iterations=2000, seed=1)
+    battle = BattleSystem("charmander", "pikachu", engine=engine)
+    battle.state.current_turn = "ai"
+    move = engine.choose(battle.ai_pokemon, battle.player_pokemon)
+    first_root = engine._tree.root
+    battle.execute_move(move)
+    battle.execute_move(0)
+    # El nuevo estado ya estaba en el árbol, dos jugadas debajo de la raíz anterior, con sus visitas.
+    expected = first_root.find(battle.ai_pokemon.current_hp, battle.player_pokemon.current_hp, True)
+    assert expected is not None and expected.visits > 0
+    visits_before = expected.visits
+    engine.choose(battle.ai_pokemon, battle.player_pokemon)
+    assert engine._tree.root is expected
+    assert expected.visits == visits_before + 2000
+
+def test_parallel_search_sums_root_visits():
+    ai, player = get_pokemon("lapras"), get_pokemon("jigglypuff")
+    outcomes = compile_outcomes(Matchup(ai, player))
+    workers, iterations, seed = 3, 600, 7
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        totals = parallel_search(pool, workers, outcomes, ai.max_hp, player.max_hp, iterations, None,
+                                 1.4, seed)
+    expected = [0] * len(outcomes[0])
+    for i in range(workers):
+        visits = _worker_search((outcomes, ai.max_hp, player.max_hp, iterations // workers, None, 1.4, seed + i))
+        expected = [a + b for a, b in zip(expected, visits)]
+    assert totals == expected
+    assert sum(totals) == iterations
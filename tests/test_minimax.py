@@ -0,0 +1,79 @@
+import pytest
+from game.battle import BattleSystem
+from game.minimax import Matchup, SearchContext, iterative_deepening, minimax_decision, root_search
+from .reference import positions, reference_decision, roster_pairs
+
+DEPTHS = (1, 2, 3, 4)
+
+def _plain(ai, player, depth):
+    return root_search(Matchup(ai, player), ai.current_hp, player.current_hp, depth)
+
+def _with_context(ai, player, depth):
+    return root_search(Matchup(ai, player), ai.current_hp, player.current_hp, depth, context=SearchContext())
+
+def _with_aspiration(ai, player, depth):
+    context = SearchContext(aspiration_window=25)
+    # Un puntaje previo lejano obliga a reabrir la ventana.
+    context.score = 500
+    return root_search(Matchup(ai, player), ai.current_hp, player.current_hp, depth, context=context)
+
+def _deepening(ai, player, depth):
+    # Presupuesto enorme y tope de profundidad: debe coincidir con la búsqueda a esa profundidad.
+    index, score, _ = iterative_deepening(Matchup(ai, player), ai.current_hp, player.current_hp,
+                                          60_000, max_depth=depth)
+    return index, score
+
+SEARCHES = {
+    "root_search": _plain,
+    "root_search+context": _with_context,
+    "root_search+aspiration": _with_aspiration,
+    "iterative_deepening": _deepening,
+}
+
+@pytest.mark.parametrize("ai_name,player_name", roster_pairs())
+def test_searches_match_reference(ai_name, player_name):
+    failures = []
+    for ai, player in positions(ai_name, player_name):
+        for depth in DEPTHS:
+            expected = reference_decision(ai, player, depth)
+            for name, search in SEARCHES.items():
+                got = search(ai, player, depth)
+                # Iterative deepening puede parar antes si todas las hojas son terminales; basta con el ataque.
+                if got[0] != expected[0] or (name != "iterative_deepening" and got[1] != expected[1]):
+                    failures.append(f"{name} ({ai.current_hp}, {player.current_hp}) profundidad {depth}: "
+                                    f"{got} != {expected}")
+    assert not failures, "\n".join(failures)
+
+@pytest.mark.parametrize("ai_name,player_name", roster_pairs())
+def test_batch_matches_reference(ai_name, player_name):
+    batch = pytest.importorskip("game.batch")
+    for ai, player in positions(ai_name, player_name):
+        for depth in DEPTHS:
+            moves, scores = batch.batch_decision([ai.name], [player.name], [ai.current_hp],
+                                                 [player.current_hp], depth)
+            assert (int(moves[0]), int(scores[0])) == reference_decision(ai, player, depth)
+
+@pytest.mark.parametrize("depth", (2, 4, 6))
+def test_context_reuse_across_battle(depth):
+    """Reutilizar el contexto turno a turno no cambia la jugada respecto de una búsqueda desde cero."""
+    for ai_name, player_name in roster_pairs()[::7]:
+        battle = BattleSystem(player_name, ai_name)
+        ai_context, player_context = SearchContext(), SearchContext()
+        turns = 0
+        while not battle.state.game_over and turns < 60:
+            if battle.state.current_turn == "ai":
+                mover, other, context = battle.ai_pokemon, battle.player_pokemon, ai_context
+            else:
+                mover, other, context = battle.player_pokemon, battle.ai_pokemon, player_context
+            index = minimax_decision(mover, other, depth, context=context)
+            assert index == _plain(mover, other, depth)[0]
+            battle.execute_move(index)
+            ai_context.record_move(index)
+            player_context.record_move(index)
+            turns += 1
+
+@pytest.mark.parametrize("depth", (0, -1))
+def test_batch_rejects_non_positive_depth(depth):
+    batch = pytest.importorskip("game.batch")
+    with pytest.raises(ValueError):
+        batch.batch_decision(["pikachu"], ["charmander"], depth=depth)
@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+import socket
+import threading
+import pytest
+from game.minimax import WIN_SCORE, Matchup, root_search
+from game.pokemon import get_all_pokemon_names, get_pokemon
+from game.service import MAX_BODY_BYTES, DecisionService, RequestError, ServiceClient, parse_request, serve
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requiere sockets Unix")
+
+@pytest.fixture(scope="module")
+def socket_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("service") / "service.sock")
+    ready = threading.Event()
+    loop = asyncio.new_event_loop()
+
+    async def main():
+        started = asyncio.Event()
+        task = asyncio.create_task(serve(DecisionService(workers=1), unix_path=path, ready=started))
+        await started.wait()
+        ready.set()
+        await task
+
+    def run():
+        try:
+            loop.run_until_complete(main())
+        except asyncio.CancelledError:
+            pass  # así se detiene al terminar el módulo
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert ready.wait(60), "el servicio no arrancó"
+    yield path
+    loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+    thread.join(10)
+
+def _raw(path: str, request: bytes) -> bytes:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(path)
+        sock.sendall(request)
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+@pytest.mark.parametrize("ai_to_move", (True, False))
+def test_decision_matches_search(socket_path, ai_to_move):
+    client = ServiceClient(unix_path=socket_path)
+    try:
+        result = client.decide("pikachu", "charmander", 40, 90, ai_to_move, depth=4)
+    finally:
+        client.close()
+    mover, other = get_pokemon("pikachu"), get_pokemon("charmander")
+    mover_hp, other_hp = 40, 90
+    if not ai_to_move:
+        mover, other, mover_hp, other_hp = other, mover, other_hp, mover_hp
+    assert (result["move"], result["score"]) == root_search(Matchup(mover, other), mover_hp, other_hp, 4)
+
+@pytest.mark.parametrize("length", (b"abc", b"-5", b"1_0", b"+2"))
+def test_malformed_content_length_is_400(socket_path, length):
+    response = _raw(socket_path, b"POST /decision HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+    assert response.startswith(b"HTTP/1.1 400 ")
+
+def test_body_over_limit_is_413(socket_path):
+    length = str(MAX_BODY_BYTES + 1).encode()
+    response = _raw(socket_path, b"POST /decision HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+    assert response.startswith(b"HTTP/1.1 413 ")
+
+@pytest.mark.parametrize("field,value", (("time_budget_ms", True), ("depth", True), ("ai_hp", True),
+                                         ("ai_hp", 0), ("depth", 0), ("engine", "nope")))
+def test_invalid_fields_are_rejected(field, value):
+    data = {"ai": "pikachu", "player": "charmander", "ai_hp": 40, "player_hp": 90, field: value}
+    with pytest.raises(RequestError):
+        parse_request(data)
+
+def test_stats_report_latency(socket_path):
+    client = ServiceClient(unix_path=socket_path)
+    try:
+        client.decide("pikachu", "charmander", 40, 90)
+        stats = client.stats()
+    finally:
+        client.close()
+    assert stats["requests"] >= 1
+    assert stats["p50_ms"] is not None and stats["p99_ms"] >= stats["p50_ms"]
+    assert stats["queue_depth"] == 0
+
+def test_time_budget_without_depth_searches_deeper(socket_path):
+    """Sin `depth`, el presupuesto decide: lapras encuentra la victoria forzada que a profundidad 2 no ve."""
+    client = ServiceClient(unix_path=socket_path)
+    try:
+        fixed = client.decide("lapras", "jigglypuff", 390, 345)
+        budgeted = client.decide("lapras", "jigglypuff", 390, 345, time_budget_ms=300)
+    finally:
+        client.close()
+    assert fixed["depth"] == 2
+    assert budgeted["depth"] > 2
+    assert budgeted["score"] == WIN_SCORE
+
+def test_worker_contexts_are_bounded(monkeypatch):
+    from game import service
+
+    monkeypatch.setattr(service, "_contexts", type(service._contexts)())
+    names = get_all_pokemon_names()
+    for ai_name, player_name in list(itertools.permutations(names, 2))[:service.WORKER_CONTEXTS + 5]:
+        ai, player = get_pokemon(ai_name), get_pokemon(player_name)
+        service.decide(parse_request({"ai": ai_name, "player": player_name, "ai_hp": ai.max_hp,
+                                      "player_hp": player.max_hp, "depth": 6}))
+    assert len(service._contexts) == service.WORKER_CONTEXTS
+    for _, context in service._contexts.values():
+        assert context.tt.max_entries == service.CONTEXT_TT_ENTRIES
+        assert len(context.tt) <= service.CONTEXT_TT_ENTRIES
@@ -0,0 +1,76 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from game import snapshot
+from game.pokemon import PokemonDataError, parse_csv, pokemon_loader
+
+ROOT = Path(__file__).parent.parent
+
+def test_snapshot_decodes_like_csv(tmp_path):
+    path = tmp_path / "pokemon.snapshot"
+    snapshot.build(pokemon_loader.csv_path, path)
+    roster = snapshot.load_snapshot(path)
+    try:
+        assert dict(roster) == parse_csv(pokemon_loader.csv_path)
+        assert roster.csv_hash == snapshot.csv_hash(pokemon_loader.csv_path)
+    finally:
+        roster.close()
+
+def test_corrupt_snapshot_is_an_error(tmp_path):
+    path = tmp_path / "pokemon.snapshot"
+    snapshot.build(pokemon_loader.csv_path, path)
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load_snapshot(path)
+
+SNAPSHOT_ONLY_SCRIPT = """
+from game.battle import BattleSystem
+from game.policy import load_policy_book
+from game.pokemon import pokemon_loader
+from game.service import _warm_worker
+from game.snapshot import SnapshotRoster
+
+assert not pokemon_loader.csv_path.exists()
+assert isinstance(pokemon_loader.pokemon_db, SnapshotRoster)
+assert load_policy_book() is not None, "el libro debería seguir al día sin el CSV"
+battle = BattleSystem("pikachu", "charmander", engine="endgame")
+battle.execute_move(0)
+battle.execute_move(battle.engine.choose(battle.ai_pokemon, battle.player_pokemon))
+_warm_worker()
+"""
+
+def test_snapshot_only_tree(tmp_path):
+    """Sin el CSV, el snapshot basta: el libro de políticas se valida con el hash que guarda."""
+    pytest.importorskip("numpy")
+    from game.policy import build
+
+    shutil.copytree(ROOT / "game", tmp_path / "game", ignore=shutil.ignore_patterns("__pycache__"))
+    data = tmp_path / "data"
+    data.mkdir()
+    snapshot.build(pokemon_loader.csv_path, data / "pokemon.snapshot")
+    # El libro se arma con el CSV presente; su hash tiene que coincidir con el del snapshot.
+    build(data / "policy.bin")
+    result = subprocess.run([sys.executable, "-c", SNAPSHOT_ONLY_SCRIPT], cwd=tmp_path,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+CSV_HEADER = "name,type1,type2,hp,attack1,attack1_type,attack1_power,attack2,attack2_type,attack2_power\n"
+
+@pytest.mark.parametrize("row", (
+    "Pikachu,Electric,,35,Thunder Shock,Electric,40\n",             # fila corta
+    "Pikachu,Electrik,,35,Thunder Shock,Electric,40,Quick Attack,Normal,40\n",
+    "Pikachu,Electric,,35,Thunder Shock,Lightning,40,Quick Attack,Normal,40\n",
+    "Pikachu,Electric,,0,Thunder Shock,Electric,40,Quick Attack,Normal,40\n",
+))
+def test_bad_csv_rows_are_data_errors(tmp_path, row):
+    path = tmp_path / "pokemon.csv"
+    path.write_text(CSV_HEADER + row, encoding="utf-8")
+    with pytest.raises(PokemonDataError, match="línea 2"):
+        parse_csv(path)
+
+def test_neutral_types_are_accepted(tmp_path):
+    path = tmp_path / "pokemon.csv"
+    path.write_text(CSV_HEADER + "Clefairy,Fairy,,70,Pound,Normal,40,Metronome,Normal,0\n", encoding="utf-8")
+    assert parse_csv(path)["clefairy"].types == ["fairy"]
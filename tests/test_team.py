@@ -0,0 +1,50 @@
+import random
+import pytest
+from game.minimax import WIN_SCORE
+from game.pokemon import get_all_pokemon_names, get_pokemon
+from game.team import TeamBattle, TeamMatchup, TeamState, apply_action, legal_actions, team_decision
+
+def _plain_negamax(matchup: TeamMatchup, state: TeamState, depth: int) -> int:
+    """Negamax sin poda ni tabla, sobre estados inmutables."""
+    actions = legal_actions(matchup, state)
+    if not actions:
+        return -WIN_SCORE
+    if depth == 0:
+        own, other = (state.ai_hp, state.player_hp) if state.ai_to_move else (state.player_hp, state.ai_hp)
+        return sum(hp for hp in own if hp > 0) - sum(hp for hp in other if hp > 0)
+    return max(-_plain_negamax(matchup, apply_action(matchup, state, a), depth - 1) for a in actions)
+
+def _random_state(rng: random.Random, size: int):
+    names = get_all_pokemon_names()
+    ai_team = [get_pokemon(n) for n in rng.sample(names, size)]
+    player_team = [get_pokemon(n) for n in rng.sample(names, size)]
+    matchup = TeamMatchup(ai_team, player_team)
+    state = TeamState(tuple(rng.randint(0, p.max_hp) if i else p.max_hp for i, p in enumerate(ai_team)),
+                      tuple(rng.randint(0, p.max_hp) if i else p.max_hp for i, p in enumerate(player_team)),
+                      0, 0, rng.random() < 0.5)
+    return matchup, state
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("depth", (1, 2, 3, 4))
+def test_team_search_matches_plain_negamax(seed, depth):
+    matchup, state = _random_state(random.Random(seed), 3)
+    action, score, completed = team_decision(matchup, state, time_limit_ms=60_000, max_depth=depth)
+    expected = _plain_negamax(matchup, state, depth)
+    # Si encuentra un resultado forzado antes, deja de profundizar: el valor ya no cambia.
+    assert completed == depth or abs(score) == WIN_SCORE
+    assert score == expected
+    assert -_plain_negamax(matchup, apply_action(matchup, state, action), depth - 1) == expected
+
+def test_team_battle_finishes():
+    rng = random.Random(0)
+    names = get_all_pokemon_names()
+    battle = TeamBattle(rng.sample(names, 6), rng.sample(names, 6), time_limit_ms=20)
+    turns = 0
+    while not battle.state.game_over and turns < 500:
+        if battle.state.current_turn == "ai":
+            battle.execute_move(-1)
+        else:
+            battle.execute_move(rng.choice(battle.legal_actions()))
+        turns += 1
+    assert battle.state.game_over
+    assert battle.state.winner in ("ai", "player")
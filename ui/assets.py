@@ -0,0 +1,115 @@
+import argparse
+import json
+import pygame
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from game.pokemon import Pokemon, pokemon_loader
+
+IMAGES_DIR = Path(__file__).parent.parent / "data" / "images"
+ATLAS_VERSION = 1
+# Tamaños con los que la interfaz dibuja sprites y cartas; el atlas los guarda ya escalados.
+SPRITE_SIZE = (180, 180)
+CARD_SIZE = (200, 280)
+
+class AssetStore:
+    """Imágenes de los Pokémon, decodificadas la primera vez que se piden.
+
+    Si existe el atlas (`python -m ui.assets build`) se decodifica un solo PNG
+    con todos los sprites y cartas ya escalados; las imágenes que falten en él o
+    que hayan cambiado después de armarlo se leen de su archivo.
+    """
+
+    def __init__(self, images_dir: Path = IMAGES_DIR):
+        self.images_dir = images_dir
+        self._cache: Dict[str, Optional[pygame.Surface]] = {}
+        self._atlas: Optional[pygame.Surface] = None
+        self._atlas_index: Optional[Dict[str, dict]] = None
+
+    def _load_atlas(self) -> Dict[str, dict]:
+        if self._atlas_index is None:
+            self._atlas_index = {}
+            manifest = self.images_dir / "atlas.json"
+            if manifest.exists():
+                index = json.loads(manifest.read_text(encoding="utf-8"))
+                if index.get("version") != ATLAS_VERSION:
+                    raise ValueError(f"{manifest} es de otra versión; reconstrúyelo con `python -m ui.assets build`")
+                self._atlas = pygame.image.load(str(self.images_dir / index["image"]))
+                self._atlas_index = index["sources"]
+        return self._atlas_index
+
+    def _from_atlas(self, relative_path: str, path: Path) -> Optional[pygame.Surface]:
+        entry = self._load_atlas().get(relative_path)
+        if entry is None:
+            return None
+        if path.exists():
+            stat = path.stat()
+            if [stat.st_size, stat.st_mtime_ns] != entry["stamp"]:
+                return None
+        return self._atlas.subsurface(pygame.Rect(entry["rect"]))
+
+    def _load(self, relative_path: str) -> Optional[pygame.Surface]:
+        if relative_path not in self._cache:
+            path = self.images_dir / relative_path
+            image = self._from_atlas(relative_path, path)
+            if image is None and path.exists():
+                image = pygame.image.load(str(path))
+            self._cache[relative_path] = image
+        return self._cache[relative_path]
+
+    def sprite(self, pokemon: Pokemon) -> Optional[pygame.Surface]:
+        if not pokemon.image_name:
+            return None
+        return self._load(pokemon.image_name)
+
+    def card(self, pokemon: Pokemon) -> Optional[pygame.Surface]:
+        if not pokemon.card_image_name:
+            return None
+        return self._load(f"cards/{pokemon.card_image_name}")
+
+assets = AssetStore()
+
+def build_atlas(images_dir: Path = IMAGES_DIR) -> Tuple[int, Tuple[int, int]]:
+    """Arma atlas.png (una fila por especie: sprite y carta escalados) y su índice atlas.json."""
+    roster = list(pokemon_loader.pokemon_db.values())
+    slots = []
+    for pokemon in roster:
+        if pokemon.image_name:
+            slots.append((pokemon.image_name, SPRITE_SIZE))
+        if pokemon.card_image_name:
+            slots.append((f"cards/{pokemon.card_image_name}", CARD_SIZE))
+    slots = [(relative, size) for relative, size in slots if (images_dir / relative).exists()]
+
+    row_height = max(SPRITE_SIZE[1], CARD_SIZE[1])
+    width = SPRITE_SIZE[0] + CARD_SIZE[0]
+    rects: Dict[str, Tuple[int, int, int, int]] = {}
+    x = y = 0
+    for relative, (w, h) in slots:
+        if x + w > width:
+            x, y = 0, y + row_height
+        rects[relative] = (x, y, w, h)
+        x += w
+    height = y + row_height if rects else 0
+
+    atlas = pygame.Surface((width, max(height, 1)), pygame.SRCALPHA)
+    sources = {}
+    for relative, rect in rects.items():
+        path = images_dir / relative
+        image = pygame.transform.scale(pygame.image.load(str(path)), rect[2:])
+        atlas.blit(image, rect[:2])
+        stat = path.stat()
+        sources[relative] = {"rect": list(rect), "stamp": [stat.st_size, stat.st_mtime_ns]}
+    pygame.image.save(atlas, str(images_dir / "atlas.png"))
+    manifest = {"version": ATLAS_VERSION, "image": "atlas.png", "sources": sources}
+    (images_dir / "atlas.json").write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    return len(sources), atlas.get_size()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Atlas de sprites y cartas ya escalados")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="arma data/images/atlas.png y atlas.json")
+    parser.parse_args()
+    count, (width, height) = build_atlas()
+    print(f"Atlas con {count} imágenes ({width}x{height}) en {IMAGES_DIR / 'atlas.png'}")
+
+if __name__ == "__main__":
+    main()
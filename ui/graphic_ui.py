@@ -1,7 +1,10 @@
 import pygame
-from game.pokemon import get_all_pokemon_names, get_pokemon
+from game.pokemon import Ruleset, get_all_pokemon_names, get_pokemon
 from game.battle import BattleSystem
-from game.player import AIPlayer  # ← Importa la IA real con Minimax
+from game.engines import create_engine
+from game.ai_worker import AIWorker  # ← La IA real con Minimax, en un hilo aparte
+from ui.assets import CARD_SIZE, SPRITE_SIZE, assets
+from ui.render_cache import DirtyRegions, ImageCache, text_cache
 from pathlib import Path
 
 pygame.init()
@@ -11,6 +14,14 @@ BIG_FONT = pygame.font.Font(str(Path(__file__).parent.parent / "data" / "fonts"
 
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
+# Motor de la IA (ver game.engines): "minimax", "endgame" (juego perfecto con la tabla exacta),
+# "expectiminimax" o "mcts". None elige según las reglas: minimax, o expectiminimax si son aleatorias.
+AI_ENGINE = None
+AI_ENGINE_OPTIONS = {
+    "minimax": {"time_budget_ms": 200},
+    "mcts": {"time_budget_ms": 200, "iterations": 100_000},
+}
+USE_STOCHASTIC_RULES = False  # True: precisión, variación de daño y críticos
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Pokeminmax - Batalla Pokémon")
 
@@ -23,6 +34,8 @@ def load_battle_bg():
     return None
 
 BATTLE_BG = load_battle_bg()
+# Sprites y cartas ya escalados; se vacía al terminar cada combate.
+images = ImageCache()
 
 TYPE_COLORS = {
     'fire': (255, 100, 0), 'water': (0, 150, 255), 'electric': (255, 255, 0),
@@ -36,41 +49,44 @@ TYPE_COLORS = {
 def mostrar_carrusel(pokemons, ya_elegido=None, etapa="jugador"):
     index = 0
     total = len(pokemons)
+    center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+    btn_left = pygame.Rect(80, center_y - 40, 60, 60)
+    btn_right = pygame.Rect(SCREEN_WIDTH - 140, center_y - 40, 60, 60)
+    btn_select = pygame.Rect(center_x - 100, SCREEN_HEIGHT - 90, 200, 40)
+    clock = pygame.time.Clock()
+    shown = None  # la pantalla solo se redibuja al cambiar de Pokémon
 
     while True:
-        screen.fill((204, 238, 255))
-        titulo = "ELIGE TU POKÉMON" if etapa == "jugador" else "ELIGE EL POKÉMON DE LA IA"
-        title_surface = BIG_FONT.render(titulo, True, (0, 0, 0))
-        screen.blit(title_surface, ((SCREEN_WIDTH - title_surface.get_width()) // 2, 30))
-
         p = pokemons[index]
-        center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
-
-        if p.card_image:
-            img = pygame.transform.scale(p.card_image, (200, 280))
-            screen.blit(img, (center_x - 100, center_y - 140))
-
-        name_text = BIG_FONT.render(p.name.upper(), True, (0, 0, 0))
-        screen.blit(name_text, (center_x - name_text.get_width() // 2, center_y + 160))
-
-        for i, tipo in enumerate(p.types):
-            color = TYPE_COLORS.get(tipo, (150, 150, 150))
-            tipo_text = PIXEL_FONT.render(tipo.upper(), True, color)
-            screen.blit(tipo_text, (center_x - tipo_text.get_width() // 2, center_y + 190 + i * 32))
-
-        btn_left = pygame.Rect(80, center_y - 40, 60, 60)
-        btn_right = pygame.Rect(SCREEN_WIDTH - 140, center_y - 40, 60, 60)
-        btn_select = pygame.Rect(center_x - 100, SCREEN_HEIGHT - 90, 200, 40)
-
-        pygame.draw.polygon(screen, (100, 100, 100),
-            [(btn_left.right, btn_left.top), (btn_left.right, btn_left.bottom), (btn_left.left, btn_left.centery)])
-        pygame.draw.polygon(screen, (100, 100, 100),
-            [(btn_right.left, btn_right.top), (btn_right.left, btn_right.bottom), (btn_right.right, btn_right.centery)])
-        pygame.draw.rect(screen, (0, 120, 255), btn_select, border_radius=10)
-        txt = PIXEL_FONT.render("SELECCIONAR", True, (255, 255, 255))
-        screen.blit(txt, (btn_select.centerx - txt.get_width() // 2, btn_select.y + 10))
-
-        pygame.display.flip()
+        if shown != index:
+            shown = index
+            screen.fill((204, 238, 255))
+            titulo = "ELIGE TU POKÉMON" if etapa == "jugador" else "ELIGE EL POKÉMON DE LA IA"
+            title_surface = text_cache.render(BIG_FONT, titulo, (0, 0, 0))
+            screen.blit(title_surface, ((SCREEN_WIDTH - title_surface.get_width()) // 2, 30))
+
+            card_image = images.scaled(("card", p.card_image_name), assets.card(p), CARD_SIZE)
+            if card_image:
+                screen.blit(card_image, (center_x - 100, center_y - 140))
+
+            name_text = text_cache.render(BIG_FONT, p.name.upper(), (0, 0, 0))
+            screen.blit(name_text, (center_x - name_text.get_width() // 2, center_y + 160))
+
+            for i, tipo in enumerate(p.types):
+                color = TYPE_COLORS.get(tipo, (150, 150, 150))
+                tipo_text = text_cache.render(PIXEL_FONT, tipo.upper(), color)
+                screen.blit(tipo_text, (center_x - tipo_text.get_width() // 2, center_y + 190 + i * 32))
+
+            pygame.draw.polygon(screen, (100, 100, 100),
+                [(btn_left.right, btn_left.top), (btn_left.right, btn_left.bottom), (btn_left.left, btn_left.centery)])
+            pygame.draw.polygon(screen, (100, 100, 100),
+                [(btn_right.left, btn_right.top), (btn_right.left, btn_right.bottom), (btn_right.right, btn_right.centery)])
+            pygame.draw.rect(screen, (0, 120, 255), btn_select, border_radius=10)
+            txt = text_cache.render(PIXEL_FONT, "SELECCIONAR", (255, 255, 255))
+            screen.blit(txt, (btn_select.centerx - txt.get_width() // 2, btn_select.y + 10))
+
+            pygame.display.flip()
+        clock.tick(60)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); exit()
@@ -84,45 +100,58 @@ def mostrar_carrusel(pokemons, ya_elegido=None, etapa="jugador"):
                         continue
                     return p
 
-def render_battle(screen, battle: BattleSystem, anim_state: dict):
-    screen.blit(BATTLE_BG, (0, 0))
-    _render_pokemon(screen, battle.state.player_pokemon, (120, 320), flip=False)
-    _render_pokemon(screen, battle.state.ai_pokemon, (660, 320), flip=True)
-
-    _animate_hp(battle, anim_state)
-    _render_hp_bar(screen, battle.state.player_pokemon, anim_state["player_hp"], (120, 290))
-    _render_hp_bar(screen, battle.state.ai_pokemon, anim_state["ai_hp"], (660, 290))
-
-    if battle.state.last_move:
-        move_text = PIXEL_FONT.render(battle.state.last_move, True, (255, 255, 0))
-        screen.blit(move_text, (SCREEN_WIDTH // 2 - move_text.get_width() // 2, 20))
+def _restore_background(surface, rect):
+    if BATTLE_BG is not None:
+        surface.blit(BATTLE_BG, rect, rect)
+    else:
+        surface.fill((255, 255, 255), rect)
 
-    if battle.state.game_over:
-        win_text = BIG_FONT.render(f"¡GANADOR: {battle.state.winner.upper()}!", True, (255, 0, 0))
-        screen.blit(win_text, (SCREEN_WIDTH // 2 - win_text.get_width() // 2, 650))
+def render_battle(screen, battle: BattleSystem, anim_state: dict, regions: DirtyRegions):
+    """Redibuja solo las zonas que cambiaron; los rectángulos quedan en `regions` para display.update."""
+    state = battle.state
+    player, ai = state.player_pokemon, state.ai_pokemon
+    regions.draw(screen, "player", player.name, lambda: _render_pokemon(screen, player, (120, 320), flip=False))
+    regions.draw(screen, "ai", ai.name, lambda: _render_pokemon(screen, ai, (660, 320), flip=True))
 
-    if not battle.state.game_over and battle.state.current_turn == 'player':
-        render_attack_buttons(screen, battle.get_available_attacks())
+    _animate_hp(battle, anim_state)
+    regions.draw(screen, "player_hp", (player.current_hp, anim_state["player_hp"]),
+                 lambda: _render_hp_bar(screen, player, anim_state["player_hp"], (120, 290)))
+    regions.draw(screen, "ai_hp", (ai.current_hp, anim_state["ai_hp"]),
+                 lambda: _render_hp_bar(screen, ai, anim_state["ai_hp"], (660, 290)))
+
+    regions.draw(screen, "message", state.last_move, lambda: _render_centered(screen, state.last_move, PIXEL_FONT,
+                                                                              (255, 255, 0), 20))
+    # Los botones se borran antes de escribir el ganador, que ocupa parte de su lugar.
+    attacks = battle.get_available_attacks() if not state.game_over and state.current_turn == 'player' else []
+    regions.draw(screen, "attacks", tuple(atk.name for atk in attacks),
+                 lambda: render_attack_buttons(screen, attacks))
+    winner = f"¡GANADOR: {state.winner.upper()}!" if state.game_over else None
+    regions.draw(screen, "winner", winner, lambda: _render_centered(screen, winner, BIG_FONT, (255, 0, 0), 650))
+
+def _render_centered(screen, text, font, color, y):
+    if not text:
+        return None
+    surface = text_cache.render(font, text, color)
+    return screen.blit(surface, (SCREEN_WIDTH // 2 - surface.get_width() // 2, y))
 
 def _render_pokemon(screen, pokemon, pos, flip=False):
-    if pokemon.image:
-        img = pygame.transform.scale(pokemon.image, (180, 180))
-        if flip:
-            img = pygame.transform.flip(img, True, False)
-        screen.blit(img, pos)
-        name = PIXEL_FONT.render(pokemon.name.upper(), True, (0, 0, 0))
-        screen.blit(name, (pos[0] + 90 - name.get_width() // 2, pos[1] + 190))
+    img = images.scaled(("sprite", pokemon.image_name), assets.sprite(pokemon), SPRITE_SIZE, flip)
+    if img:
+        rect = screen.blit(img, pos)
+        name = text_cache.render(PIXEL_FONT, pokemon.name.upper(), (0, 0, 0))
+        return rect.union(screen.blit(name, (pos[0] + 90 - name.get_width() // 2, pos[1] + 190)))
+    return None
 
 def _render_hp_bar(screen, pokemon, display_hp, pos):
     x, y = pos
     bar_w = 180
     bar_h = 18
     ratio = max(0, display_hp / pokemon.max_hp)
-    pygame.draw.rect(screen, (0, 0, 0), (x-2, y-2, bar_w+4, bar_h+4), 2)
+    rect = pygame.draw.rect(screen, (0, 0, 0), (x-2, y-2, bar_w+4, bar_h+4), 2)
     pygame.draw.rect(screen, (255, 0, 0), (x, y, int(bar_w * ratio), bar_h))
     pygame.draw.rect(screen, (230, 230, 230), (x + int(bar_w * ratio), y, bar_w - int(bar_w * ratio), bar_h))
-    ps_text = PIXEL_FONT.render(f"{pokemon.current_hp}/{pokemon.max_hp}", True, (255, 255, 255))
-    screen.blit(ps_text, (x + bar_w // 2 - ps_text.get_width() // 2, y - 20))
+    ps_text = text_cache.render(PIXEL_FONT, f"{pokemon.current_hp}/{pokemon.max_hp}", (255, 255, 255))
+    return rect.union(screen.blit(ps_text, (x + bar_w // 2 - ps_text.get_width() // 2, y - 20)))
 
 def _animate_hp(battle: BattleSystem, anim_state):
     speed = 2
@@ -138,31 +167,47 @@ def render_attack_buttons(screen, attacks):
     btn_h = 36
     start_x = SCREEN_WIDTH - 300
     y_start = SCREEN_HEIGHT - (len(attacks) * (btn_h + padding)) - 30
+    area = None
 
     for i, atk in enumerate(attacks):
-        text_surface = PIXEL_FONT.render(atk.name.upper(), True, (0, 0, 0))
+        text_surface = text_cache.render(PIXEL_FONT, atk.name.upper(), (0, 0, 0))
         text_width = text_surface.get_width()
         btn_w = text_width + 30
         rect = pygame.Rect(start_x, y_start + i * (btn_h + padding), btn_w, btn_h)
         pygame.draw.rect(screen, (100, 200, 255), rect, border_radius=8)
         pygame.draw.rect(screen, (0, 0, 0), rect, 2)
         screen.blit(text_surface, (rect.centerx - text_width // 2, rect.centery - text_surface.get_height() // 2))
+        area = rect if area is None else area.union(rect)
+    return area
 
 def combate_grafico():
     pokemons = [get_pokemon(name) for name in get_all_pokemon_names()]
     jugador = mostrar_carrusel(pokemons, etapa="jugador")
     ia = mostrar_carrusel(pokemons, ya_elegido=jugador, etapa="ia")
 
-    battle = BattleSystem(jugador.name, ia.name)
+    rules = Ruleset() if USE_STOCHASTIC_RULES else None
+    engine_name = AI_ENGINE or ("minimax" if rules is None else "expectiminimax")
+    engine = create_engine(engine_name, **AI_ENGINE_OPTIONS.get(engine_name, {}))
+    battle = BattleSystem(jugador.name, ia.name, rules, engine=engine)
     anim_state = {"player_hp": jugador.current_hp, "ai_hp": ia.current_hp}
 
+    ai_worker = AIWorker(battle)
+    ai_worker.ponder()
+    ai_future = None
+    ai_turn_due = False
+
     clock = pygame.time.Clock()
     IA_TURNO_EVENT = pygame.USEREVENT + 1
     running = True
+    # El fondo se pinta una vez; después solo se actualizan las zonas que cambian.
+    regions = DirtyRegions(_restore_background)
+    _restore_background(screen, screen.get_rect())
+    render_battle(screen, battle, anim_state, regions)
+    regions.flush()
+    pygame.display.flip()
 
     while running:
-        screen.fill((255, 255, 255))
-        render_battle(screen, battle, anim_state)
+        render_battle(screen, battle, anim_state, regions)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -178,16 +223,28 @@ def combate_grafico():
                     if rect.collidepoint(mx, my):
                         battle.execute_move(i)
                         if not battle.state.game_over and battle.state.current_turn == 'ai':
+                            ai_future = ai_worker.reply_to(i)
                             pygame.time.set_timer(IA_TURNO_EVENT, 1500, loops=1)
 
             elif event.type == IA_TURNO_EVENT and not battle.state.game_over and battle.state.current_turn == 'ai':
-                ai_player = AIPlayer(battle.ai_pokemon)
-                attack = ai_player.choose_attack(battle.player_pokemon)
-                index = battle.ai_pokemon.attacks.index(attack)
-                battle.execute_move(index)
+                ai_turn_due = True
                 pygame.time.set_timer(IA_TURNO_EVENT, 0)
 
-        pygame.display.flip()
+        # La búsqueda corre en otro hilo: aquí solo se consulta si ya terminó, nunca se espera.
+        if ai_turn_due and ai_future is not None and ai_future.done():
+            ai_worker.finish()
+            battle.execute_move(ai_future.result())
+            ai_future = None
+            ai_turn_due = False
+            if not battle.state.game_over:
+                ai_worker.ponder()
+
+        dirty = regions.flush()
+        if dirty:
+            pygame.display.update(dirty)
         clock.tick(60)
 
+    ai_worker.shutdown()
+    battle.engine.close()
+    images.clear()
     pygame.quit()
@@ -0,0 +1,91 @@
+import pygame
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+Color = Tuple[int, int, int]
+
+def _prepare(surface: pygame.Surface) -> pygame.Surface:
+    # Con la ventana ya abierta, convertir al formato de la pantalla abarata cada blit.
+    return surface.convert_alpha() if pygame.display.get_surface() is not None else surface
+
+class ImageCache:
+    """Imágenes escaladas (y volteadas) una sola vez; se vacía al terminar cada combate."""
+
+    def __init__(self):
+        self._images: Dict[Hashable, pygame.Surface] = {}
+
+    def scaled(self, key: Hashable, source: Optional[pygame.Surface], size: Tuple[int, int],
+               flip: bool = False) -> Optional[pygame.Surface]:
+        if source is None:
+            return None
+        cache_key = (key, size, flip)
+        image = self._images.get(cache_key)
+        if image is None:
+            image = source if source.get_size() == size else pygame.transform.scale(source, size)
+            if flip:
+                image = pygame.transform.flip(image, True, False)
+            image = self._images[cache_key] = _prepare(image)
+        return image
+
+    def clear(self) -> None:
+        self._images.clear()
+
+class TextCache:
+    """Textos ya renderizados, con desalojo LRU: la mayoría se repiten cuadro tras cuadro."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._surfaces: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str, color: Color) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self._surfaces[key] = font.render(text, True, color)
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+class DirtyRegions:
+    """Zonas de la pantalla que se redibujan solo cuando cambia lo que muestran.
+
+    Cada zona tiene un nombre y una clave con lo que dibuja (PS, texto, turno...).
+    Si la clave no cambió no se toca; si cambió, se restaura el fondo donde
+    estaba, se dibuja de nuevo y ambos rectángulos quedan para
+    `pygame.display.update`. Si dos zonas se superponen, la que se dibuja
+    después tiene que ser la que queda visible.
+    """
+
+    def __init__(self, restore: Callable[[pygame.Surface, pygame.Rect], None]):
+        self._restore = restore
+        self._keys: Dict[str, Hashable] = {}
+        self._rects: Dict[str, pygame.Rect] = {}
+        self._dirty: List[pygame.Rect] = []
+
+    def draw(self, surface: pygame.Surface, name: str, key: Hashable,
+             paint: Callable[[], Optional[pygame.Rect]]) -> None:
+        """`paint` dibuja la zona y devuelve el rectángulo que ocupó (None si no dibujó nada)."""
+        if name in self._keys and self._keys[name] == key:
+            return
+        self._keys[name] = key
+        old = self._rects.pop(name, None)
+        if old is not None:
+            self._restore(surface, old)
+            self._dirty.append(old)
+        rect = paint()
+        if rect is not None:
+            self._rects[name] = rect
+            self._dirty.append(rect)
+
+    def invalidate(self) -> None:
+        """Olvida lo dibujado (p. ej. tras repintar toda la pantalla): todas las zonas se redibujan."""
+        self._keys.clear()
+        self._rects.clear()
+
+    def flush(self) -> List[pygame.Rect]:
+        dirty, self._dirty = self._dirty, []
+        return dirty
+
+text_cache = TextCache()